@@ -0,0 +1,230 @@
+import argparse
+import time
+from concurrent.futures import ProcessPoolExecutor
+from bitboard_grid import BitboardGrid
+from engine import Engine, find_placements, NOOP, MOVE_LEFT, MOVE_RIGHT, ROTATE, HARD_DROP
+
+class Heuristic:
+    """Linear board evaluation, larger is better.
+
+    The default weights are the well-known hand-tuned set for aggregate
+    height, lines cleared, holes and bumpiness.
+    """
+
+    def __init__(self, aggregate_height=-0.51, lines=0.76, holes=-0.36, bumpiness=-0.18):
+        self.aggregate_height = aggregate_height
+        self.lines = lines
+        self.holes = holes
+        self.bumpiness = bumpiness
+
+    def evaluate(self, grid, lines_cleared):
+        heights = grid.heights
+        bumpiness = 0
+        for column in range(len(heights) - 1):
+            bumpiness += abs(heights[column] - heights[column + 1])
+        return (self.aggregate_height * sum(heights)
+            + self.lines * lines_cleared
+            + self.holes * count_holes(grid)
+            + self.bumpiness * bumpiness)
+
+def count_holes(grid):
+    # Empty cells with something above them, one row of bitmasks at a time
+    holes = 0
+    covered = 0
+    for row in grid.rows:
+        holes += bin(covered & ~row).count("1")
+        covered |= row
+    return holes
+
+def snapshot(grid):
+    """A BitboardGrid copy of any Grid-like board, safe to simulate on."""
+    if isinstance(grid, BitboardGrid):
+        return grid.copy()
+    board = BitboardGrid()
+    for row in range(grid.num_rows):
+        for column in range(grid.num_cols):
+            board.set_cell(row, column, grid.get_cell(row, column))
+    return board
+
+def apply_placement(grid, block, placement):
+    """Return (new grid, lines cleared) after locking `block` at `placement`."""
+    rotation_state, row_offset, column_offset = placement
+    board = grid.copy()
+    for row, column in block.rotations[rotation_state].tiles:
+        board.set_cell(row + row_offset, column + column_offset, block.id)
+    return board, board.clear_full_rows()
+
+def evaluate_placement(grid, block, placement, next_block, heuristic):
+    """Score one placement, looking one piece ahead if next_block is given.
+
+    Module level so it can be shipped to worker processes.
+    """
+    board, lines = apply_placement(grid, block, placement)
+    if next_block is None:
+        return heuristic.evaluate(board, lines)
+    best = float("-inf")
+    for next_placement in find_placements(board, next_block):
+        after, next_lines = apply_placement(board, next_block, next_placement)
+        best = max(best, heuristic.evaluate(after, lines + next_lines))
+    return best
+
+def evaluate_placements(grid, block, placements, next_block, heuristic):
+    return [evaluate_placement(grid, block, placement, next_block, heuristic) for placement in placements]
+
+def best_placement(placements, values):
+    best = max(range(len(placements)), key=lambda index: values[index])
+    return placements[best]
+
+class AutoPlayer:
+    """Bot that plays the best placement of each piece.
+
+    Every reachable placement of current_block (see find_placements) is
+    scored with `heuristic`, optionally looking ahead to every placement
+    of next_block. With `workers` the lookahead runs in a process pool
+    started with `mp_context`. play_piece waits for the pool; next_action,
+    called once per frame, never does: it walks toward the greedy choice
+    and switches to the lookahead choice when the search is done. At most
+    one search is in flight, so a search for a piece that has already
+    locked finishes and is dropped before the next one is submitted.
+    """
+
+    def __init__(self, heuristic=None, lookahead=True, workers=0, mp_context=None):
+        self.heuristic = heuristic if heuristic is not None else Heuristic()
+        self.lookahead = lookahead
+        self.workers = workers
+        self.pool = ProcessPoolExecutor(workers, mp_context=mp_context) if workers else None
+        self.block = None
+        self.target = None
+        # Board, placements and next block of the current piece, taken when it
+        # spawned; None when no lookahead result is pending for it
+        self.position = None
+        # (block, futures) of the lookahead search running in the pool
+        self.search = None
+
+    def close(self):
+        # Called from the render loop, so don't wait for a running search;
+        # the workers exit on their own once it is done
+        if self.search is not None:
+            for future in self.search[1]:
+                future.cancel()
+        self.search = None
+        self.position = None
+        if self.pool is not None:
+            self.pool.shutdown(wait=False)
+
+    def get_position(self, game):
+        grid = snapshot(game.grid)
+        next_block = game.next_block if self.lookahead else None
+        return grid, find_placements(grid, game.current_block), next_block
+
+    def submit_search(self, block, position):
+        grid, placements, next_block = position
+        # One pool task per chunk of placements keeps pickling overhead down
+        chunks = [placements[index::self.workers] for index in range(self.workers)]
+        return [self.pool.submit(evaluate_placements, grid, block, chunk, next_block, self.heuristic)
+            for chunk in chunks]
+
+    def collect_search(self, placements, futures):
+        # Undo the round-robin split so values line up with placements
+        values = [None] * len(placements)
+        for index, future in enumerate(futures):
+            values[index::self.workers] = future.result()
+        return values
+
+    def choose_placement(self, game):
+        """Best placement of the current piece, waiting for the pool if there is one."""
+        grid, placements, next_block = position = self.get_position(game)
+        if not placements:
+            return None
+        block = game.current_block
+        if self.pool is None or next_block is None:
+            values = evaluate_placements(grid, block, placements, next_block, self.heuristic)
+        else:
+            values = self.collect_search(placements, self.submit_search(block, position))
+        return best_placement(placements, values)
+
+    def poll_search(self, game):
+        """Take the result of a finished search and start one for the current piece if none is running."""
+        block = game.current_block
+        if self.search is not None:
+            search_block, futures = self.search
+            if not all(future.done() for future in futures):
+                return
+            self.search = None
+            if search_block is block:
+                self.target = best_placement(self.position[1], self.collect_search(self.position[1], futures))
+                self.position = None
+                return
+        self.search = (block, self.submit_search(block, self.position))
+
+    def next_action(self, game):
+        """One action per call that walks the current piece to its target."""
+        if game.current_block is not self.block:
+            self.block = game.current_block
+            if self.pool is None:
+                self.target = self.choose_placement(game)
+            else:
+                # Greedy target right away, the lookahead one when the pool has it
+                grid, placements, next_block = self.position = self.get_position(game)
+                self.target = best_placement(placements, evaluate_placements(grid, self.block, placements, None,
+                    self.heuristic)) if placements else None
+                if not placements or next_block is None:
+                    self.position = None
+        if self.position is not None:
+            self.poll_search(game)
+        if self.target is None:
+            return HARD_DROP
+        rotation_state, row_offset, column_offset = self.target
+        block = game.current_block
+        if block.rotation_state != rotation_state:
+            return ROTATE
+        if block.column_offset > column_offset:
+            return MOVE_LEFT
+        if block.column_offset < column_offset:
+            return MOVE_RIGHT
+        if self.position is not None:
+            # Let gravity carry the piece while its lookahead may still change the target
+            return NOOP
+        return HARD_DROP
+
+    def play_piece(self, game):
+        # Search to the end first, then walk there; without gravity a blocked
+        # move would repeat forever, so cap the walk
+        block = game.current_block
+        self.block = block
+        self.target = self.choose_placement(game)
+        self.position = None
+        for i in range(len(block.rotations) + game.grid.num_cols):
+            if game.current_block is not block or game.game_over:
+                return
+            game.apply_action(self.next_action(game))
+        if game.current_block is block and not game.game_over:
+            game.apply_action(HARD_DROP)
+
+def main():
+    parser = argparse.ArgumentParser(description="Soak-test the 2D engine with headless bot games.")
+    parser.add_argument("--games", type=int, default=5)
+    parser.add_argument("--max-pieces", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=0)
+    parser.add_argument("--no-lookahead", action="store_true")
+    args = parser.parse_args()
+
+    player = AutoPlayer(lookahead=not args.no_lookahead, workers=args.workers)
+    pieces = 0
+    scores = []
+    start = time.perf_counter()
+    for i in range(args.games):
+        game = Engine(BitboardGrid())
+        for j in range(args.max_pieces):
+            if game.game_over:
+                break
+            player.play_piece(game)
+            pieces += 1
+        scores.append(game.score)
+    elapsed = time.perf_counter() - start
+    player.close()
+    print(f"{args.games} games, {pieces} pieces in {elapsed:.2f}s ({pieces / elapsed:.0f} pieces/s)")
+    print(f"average score {sum(scores) / len(scores):.0f}, best {max(scores)}")
+
+if __name__ == "__main__":
+    main()
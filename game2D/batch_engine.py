@@ -0,0 +1,194 @@
+import numpy as np
+from engine import MOVE_LEFT, MOVE_RIGHT, SOFT_DROP, ROTATE, HARD_DROP, GRAVITY_FRAMES, BLOCK_TYPES
+
+# Same table as Engine.update_score, indexed by lines cleared
+LINE_SCORES = np.array([0, 100, 300, 500, 0], dtype=np.int64)
+
+def build_piece_tables():
+    """Return (cells, num_rotations, spawn) arrays built from blocks.py.
+
+    Pieces are indexed by block id - 1 (the BLOCK_TYPES order), so boards
+    store piece + 1 just like Grid does. cells has shape (7, 4, 4, 2):
+    piece, rotation, tile, (row, column). Pieces with fewer than four
+    rotations repeat their states so every lookup stays in range.
+    """
+    cells = np.zeros((len(BLOCK_TYPES), 4, 4, 2), dtype=np.int64)
+    num_rotations = np.zeros(len(BLOCK_TYPES), dtype=np.int64)
+    spawn = np.zeros((len(BLOCK_TYPES), 2), dtype=np.int64)
+    for piece, block_type in enumerate(BLOCK_TYPES):
+        block = block_type()
+        num_rotations[piece] = len(block.rotations)
+        spawn[piece] = (block.row_offset, block.column_offset)
+        for rotation in range(4):
+            cells[piece, rotation] = block.rotations[rotation % len(block.rotations)].tiles
+    return cells, num_rotations, spawn
+
+PIECE_CELLS, NUM_ROTATIONS, SPAWN_OFFSETS = build_piece_tables()
+
+class BatchEngine:
+    """Runs N games of the Engine rules in lockstep on one (N, rows, cols) array.
+
+    Every per-board field is a NumPy array indexed by board, and moves,
+    collision tests, locks and line clears are applied to all boards at once.
+    Boards that hit game over are frozen until reset() is called on them.
+    """
+
+    def __init__(self, num_boards, num_rows=20, num_cols=10, gravity_frames=GRAVITY_FRAMES, seed=None):
+        self.num_boards = num_boards
+        self.num_rows = num_rows
+        self.num_cols = num_cols
+        self.gravity_frames = gravity_frames
+        self.rng = np.random.default_rng(seed)
+        self.boards = np.zeros((num_boards, num_rows, num_cols), dtype=np.uint8)
+        self.bags = np.zeros((num_boards, len(BLOCK_TYPES)), dtype=np.int64)
+        self.bag_index = np.zeros(num_boards, dtype=np.int64)
+        self.piece = np.zeros(num_boards, dtype=np.int64)
+        self.next_piece = np.zeros(num_boards, dtype=np.int64)
+        self.rotation = np.zeros(num_boards, dtype=np.int64)
+        self.row = np.zeros(num_boards, dtype=np.int64)
+        self.column = np.zeros(num_boards, dtype=np.int64)
+        self.score = np.zeros(num_boards, dtype=np.int64)
+        self.lines = np.zeros(num_boards, dtype=np.int64)
+        self.game_over = np.zeros(num_boards, dtype=bool)
+        self.frame = 0
+        self.reset()
+
+    def reset(self, mask=None):
+        idx = self._indices(mask)
+        self.boards[idx] = 0
+        self.score[idx] = 0
+        self.lines[idx] = 0
+        self.game_over[idx] = False
+        self._refill_bags(idx)
+        self.next_piece[idx] = self._take_from_bags(idx)
+        self._spawn(idx)
+
+    def _indices(self, mask):
+        if mask is None:
+            return np.arange(self.num_boards)
+        return np.flatnonzero(mask)
+
+    def _refill_bags(self, idx):
+        pieces = np.tile(np.arange(len(BLOCK_TYPES)), (len(idx), 1))
+        self.bags[idx] = self.rng.permuted(pieces, axis=1)
+        self.bag_index[idx] = 0
+
+    def _take_from_bags(self, idx):
+        pieces = self.bags[idx, self.bag_index[idx]]
+        self.bag_index[idx] += 1
+        self._refill_bags(idx[self.bag_index[idx] == len(BLOCK_TYPES)])
+        return pieces
+
+    def _spawn(self, idx):
+        self.piece[idx] = self.next_piece[idx]
+        self.next_piece[idx] = self._take_from_bags(idx)
+        self.rotation[idx] = 0
+        self.row[idx] = SPAWN_OFFSETS[self.piece[idx], 0]
+        self.column[idx] = SPAWN_OFFSETS[self.piece[idx], 1]
+        self.game_over[idx] |= ~self.fits(idx, self.rotation[idx], self.row[idx], self.column[idx])
+
+    def cell_positions(self, idx, rotation, row, column):
+        """Return (rows, columns) arrays of shape (len(idx), 4)."""
+        tiles = PIECE_CELLS[self.piece[idx], rotation]
+        return tiles[:, :, 0] + row[:, None], tiles[:, :, 1] + column[:, None]
+
+    def fits(self, idx, rotation, row, column):
+        """Vectorized block_inside() and block_fits() for the boards in idx."""
+        rows, columns = self.cell_positions(idx, rotation, row, column)
+        inside = (rows >= 0) & (rows < self.num_rows) & (columns >= 0) & (columns < self.num_cols)
+        occupied = self.boards[idx[:, None], rows.clip(0, self.num_rows - 1), columns.clip(0, self.num_cols - 1)]
+        return (inside & (occupied == 0)).all(axis=1)
+
+    def _try_move(self, idx, rows, columns, rotations):
+        rotation = (self.rotation[idx] + rotations) % NUM_ROTATIONS[self.piece[idx]]
+        row = self.row[idx] + rows
+        column = self.column[idx] + columns
+        ok = self.fits(idx, rotation, row, column)
+        moved = idx[ok]
+        self.rotation[moved] = rotation[ok]
+        self.row[moved] = row[ok]
+        self.column[moved] = column[ok]
+        return ok
+
+    def move_down(self, idx):
+        """Move the pieces in idx down one row, locking the ones that can't."""
+        ok = self._try_move(idx, 1, 0, 0)
+        self.lock(idx[~ok])
+
+    def drop(self, idx):
+        """Move the pieces in idx straight down as far as they go.
+
+        Returns the number of rows each piece fell.
+        """
+        start = self.row[idx].copy()
+        falling = idx
+        while len(falling) > 0:
+            ok = self._try_move(falling, 1, 0, 0)
+            falling = falling[ok]
+        return self.row[idx] - start
+
+    def lock(self, idx):
+        if len(idx) == 0:
+            return np.zeros(0, dtype=np.int64)
+        rows, columns = self.cell_positions(idx, self.rotation[idx], self.row[idx], self.column[idx])
+        self.boards[idx[:, None], rows, columns] = (self.piece[idx] + 1)[:, None]
+        cleared = self.clear_full_rows(idx)
+        self.lines[idx] += cleared
+        self.score[idx] += LINE_SCORES[cleared]
+        self._spawn(idx)
+        return cleared
+
+    def clear_full_rows(self, idx):
+        boards = self.boards[idx]
+        full = (boards != 0).all(axis=2)
+        cleared = full.sum(axis=1)
+        changed = cleared > 0
+        if changed.any():
+            boards = boards[changed]
+            # A stable sort puts full rows on top and keeps the others in order
+            order = np.argsort(~full[changed], axis=1, kind="stable")
+            boards = np.take_along_axis(boards, order[:, :, None], axis=1)
+            boards[np.arange(self.num_rows)[None, :] < cleared[changed][:, None]] = 0
+            self.boards[idx[changed]] = boards
+        return cleared
+
+    def step(self, actions):
+        """Apply one action per board (see engine.py) and advance one frame.
+
+        Returns the game_over array; finished boards ignore their actions.
+        """
+        actions = np.asarray(actions)
+        active = ~self.game_over
+        self._try_move(np.flatnonzero(active & (actions == MOVE_LEFT)), 0, -1, 0)
+        self._try_move(np.flatnonzero(active & (actions == MOVE_RIGHT)), 0, 1, 0)
+        self._try_move(np.flatnonzero(active & (actions == ROTATE)), 0, 0, 1)
+        dropping = np.flatnonzero(active & (actions == SOFT_DROP))
+        self.move_down(dropping)
+        self.score[dropping] += 1
+        dropping = np.flatnonzero(active & (actions == HARD_DROP) & ~self.game_over)
+        self.score[dropping] += self.drop(dropping)
+        self.lock(dropping)
+        self.frame += 1
+        if self.frame % self.gravity_frames == 0:
+            self.move_down(np.flatnonzero(~self.game_over))
+        return self.game_over
+
+    def place(self, rotations, columns):
+        """Drop every active piece straight down at the given rotation/column.
+
+        This is the placement-policy interface: one call locks one piece per
+        board. Returns (lines cleared, legal) arrays; a board whose requested
+        placement does not fit at the current row keeps its piece in place.
+        """
+        idx = np.flatnonzero(~self.game_over)
+        rotation = np.asarray(rotations)[idx] % NUM_ROTATIONS[self.piece[idx]]
+        column = np.asarray(columns)[idx]
+        legal = np.zeros(self.num_boards, dtype=bool)
+        legal[idx] = self.fits(idx, rotation, self.row[idx], column)
+        idx_legal = idx[legal[idx]]
+        self.rotation[idx_legal] = rotation[legal[idx]]
+        self.column[idx_legal] = column[legal[idx]]
+        self.drop(idx_legal)
+        cleared = np.zeros(self.num_boards, dtype=np.int64)
+        cleared[idx_legal] = self.lock(idx_legal)
+        return cleared, legal
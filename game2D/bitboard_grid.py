@@ -0,0 +1,90 @@
+class BitboardGrid:
+	"""Drop-in replacement for Grid that packs each row into an int bitmask.
+
+	Bit `column` of `self.rows[row]` is set when that cell is occupied, and
+	`self.cells[row]` keeps the block id of every cell in a bytearray so the
+	board can still be drawn in color. A full row is a single compare against
+	`self.full_row`, and clearing rows is a list splice instead of a cell walk.
+	"""
+
+	def __init__(self):
+		self.num_rows = 20
+		self.num_cols = 10
+		self.cell_size = 30
+		self.full_row = (1 << self.num_cols) - 1
+		self.rows = [0] * self.num_rows
+		self.cells = [bytearray(self.num_cols) for i in range(self.num_rows)]
+		# Skyline index: number of rows from the floor up to each column's top cell
+		self.heights = [0] * self.num_cols
+
+	def print_grid(self):
+		for row in range(self.num_rows):
+			print(" ".join(str(value) for value in self.cells[row]))
+
+	def is_inside(self, row, column):
+		if row >= 0 and row < self.num_rows and column >= 0 and column < self.num_cols:
+			return True
+		return False
+
+	def is_empty(self, row, column):
+		return not (self.rows[row] >> column) & 1
+
+	def fits(self, rotation, row_offset, column_offset):
+		# rotation is a RotationTable already known to be inside the grid
+		shift = column_offset + rotation.min_column
+		for row, mask in rotation.row_masks:
+			if self.rows[row + row_offset] & (mask << shift):
+				return False
+		return True
+
+	def get_cell(self, row, column):
+		return self.cells[row][column]
+
+	def set_cell(self, row, column, value):
+		if value:
+			self.rows[row] |= 1 << column
+			self.heights[column] = max(self.heights[column], self.num_rows - row)
+		else:
+			self.rows[row] &= ~(1 << column)
+			if self.heights[column] == self.num_rows - row:
+				self.update_height(column)
+		self.cells[row][column] = value
+
+	def update_height(self, column, start_row=0):
+		self.heights[column] = 0
+		for row in range(start_row, self.num_rows):
+			if (self.rows[row] >> column) & 1:
+				self.heights[column] = self.num_rows - row
+				break
+
+	def is_row_full(self, row):
+		return self.rows[row] == self.full_row
+
+	def clear_full_rows(self):
+		kept = [row for row in range(self.num_rows) if self.rows[row] != self.full_row]
+		completed = self.num_rows - len(kept)
+		if completed > 0:
+			self.rows = [0] * completed + [self.rows[row] for row in kept]
+			self.cells = [bytearray(self.num_cols) for i in range(completed)] + [self.cells[row] for row in kept]
+			# Full rows span every column, so no column can end up taller than
+			# height - completed; scan down from there to the new top cell
+			for column in range(self.num_cols):
+				self.update_height(column, self.num_rows - self.heights[column] + completed)
+		return completed
+
+	def copy(self):
+		grid = BitboardGrid.__new__(BitboardGrid)
+		grid.__dict__.update(self.__dict__)
+		grid.rows = self.rows[:]
+		grid.cells = [bytearray(row) for row in self.cells]
+		grid.heights = self.heights[:]
+		return grid
+
+	def reset(self):
+		self.rows = [0] * self.num_rows
+		self.cells = [bytearray(self.num_cols) for i in range(self.num_rows)]
+		self.heights = [0] * self.num_cols
+
+	def draw(self, screen):
+		from renderer import draw_grid
+		draw_grid(screen, self)
@@ -1,42 +1,60 @@
-from colors import Colors
-import pygame
+from collections import namedtuple
 from position import Position
 
+# Immutable per-rotation cell table: tiles are (row, column) pairs relative to
+# the block offset, the extents bound them, and row_masks holds one
+# (row, column bitmask) pair per occupied row for bitboard collision tests.
+# Mask bits start at min_column so they never need a negative shift.
+# bottoms holds one (column, lowest tile row) pair per covered column.
+RotationTable = namedtuple("RotationTable", "tiles min_row max_row min_column max_column row_masks bottoms")
+
+def build_rotations(cells):
+	rotations = []
+	for rotation_state in sorted(cells):
+		tiles = tuple(cells[rotation_state])
+		rows = [row for row, column in tiles]
+		columns = [column for row, column in tiles]
+		min_column = min(columns)
+		masks = {}
+		bottoms = {}
+		for row, column in tiles:
+			masks[row] = masks.get(row, 0) | (1 << (column - min_column))
+			bottoms[column] = max(bottoms.get(column, row), row)
+		rotations.append(RotationTable(tiles, min(rows), max(rows), min_column, max(columns),
+			tuple(sorted(masks.items())), tuple(sorted(bottoms.items()))))
+	return tuple(rotations)
+
 class Block:
+	rotations = ()
+
 	def __init__(self, id):
 		self.id = id
-		self.cells = {}
 		self.cell_size = 30
 		self.row_offset = 0
 		self.column_offset = 0
 		self.rotation_state = 0
-		self.colors = Colors.get_cell_colors()
 
 	def move(self, rows, columns):
 		self.row_offset += rows
 		self.column_offset += columns
 
+	def get_rotation(self):
+		return self.rotations[self.rotation_state]
+
 	def get_cell_positions(self):
-		tiles = self.cells[self.rotation_state]
-		moved_tiles = []
-		for position in tiles:
-			position = Position(position.row + self.row_offset, position.column + self.column_offset)
-			moved_tiles.append(position)
-		return moved_tiles
+		return [Position(row + self.row_offset, column + self.column_offset)
+			for row, column in self.rotations[self.rotation_state].tiles]
 
 	def rotate(self):
 		self.rotation_state += 1
-		if self.rotation_state == len(self.cells):
+		if self.rotation_state == len(self.rotations):
 			self.rotation_state = 0
 
 	def undo_rotation(self):
 		self.rotation_state -= 1
 		if self.rotation_state == -1:
-			self.rotation_state = len(self.cells) - 1
+			self.rotation_state = len(self.rotations) - 1
 
 	def draw(self, screen, offset_x, offset_y):
-		tiles = self.get_cell_positions()
-		for tile in tiles:
-			tile_rect = pygame.Rect(offset_x + tile.column * self.cell_size, 
-				offset_y + tile.row * self.cell_size, self.cell_size -1, self.cell_size -1)
-			pygame.draw.rect(screen, self.colors[self.id], tile_rect)
+		from renderer import draw_block
+		draw_block(screen, self, offset_x, offset_y)
@@ -1,76 +1,82 @@
-from block import Block
-from position import Position
+from block import Block, build_rotations
 
 class LBlock(Block):
+	rotations = build_rotations({
+		0: [(0, 2), (1, 0), (1, 1), (1, 2)],
+		1: [(0, 1), (1, 1), (2, 1), (2, 2)],
+		2: [(1, 0), (1, 1), (1, 2), (2, 0)],
+		3: [(0, 0), (0, 1), (1, 1), (2, 1)]
+	})
+
 	def __init__(self):
 		super().__init__(id = 1)
-		self.cells = {
-			0: [Position(0, 2), Position(1, 0), Position(1, 1), Position(1, 2)],
-			1: [Position(0, 1), Position(1, 1), Position(2, 1), Position(2, 2)],
-			2: [Position(1, 0), Position(1, 1), Position(1, 2), Position(2, 0)],
-			3: [Position(0, 0), Position(0, 1), Position(1, 1), Position(2, 1)]
-		}
 		self.move(0, 3)
 
 class JBlock(Block):
+    rotations = build_rotations({
+        0: [(0, 0), (1, 0), (1, 1), (1, 2)],
+        1: [(0, 1), (0, 2), (1, 1), (2, 1)],
+        2: [(1, 0), (1, 1), (1, 2), (2, 2)],
+        3: [(0, 1), (1, 1), (2, 0), (2, 1)]
+    })
+
     def __init__(self):
         super().__init__(id = 2)
-        self.cells = {
-            0: [Position(0, 0), Position(1, 0), Position(1, 1), Position(1, 2)],
-            1: [Position(0, 1), Position(0, 2), Position(1, 1), Position(2, 1)],
-            2: [Position(1, 0), Position(1, 1), Position(1, 2), Position(2, 2)],
-            3: [Position(0, 1), Position(1, 1), Position(2, 0), Position(2, 1)]
-        }
         self.move(0, 3)
 
 class IBlock(Block):
+    rotations = build_rotations({
+        0: [(1, 0), (1, 1), (1, 2), (1, 3)],
+        1: [(0, 2), (1, 2), (2, 2), (3, 2)],
+        2: [(2, 0), (2, 1), (2, 2), (2, 3)],
+        3: [(0, 1), (1, 1), (2, 1), (3, 1)]
+    })
+
     def __init__(self):
         super().__init__(id = 3)
-        self.cells = {
-            0: [Position(1, 0), Position(1, 1), Position(1, 2), Position(1, 3)],
-            1: [Position(0, 2), Position(1, 2), Position(2, 2), Position(3, 2)],
-            2: [Position(2, 0), Position(2, 1), Position(2, 2), Position(2, 3)],
-            3: [Position(0, 1), Position(1, 1), Position(2, 1), Position(3, 1)]
-        }
         self.move(-1, 3)
 
 class OBlock(Block):
+    rotations = build_rotations({
+        0: [(0, 0), (0, 1), (1, 0), (1, 1)]
+    })
+
     def __init__(self):
         super().__init__(id = 4)
-        self.cells = {
-            0: [Position(0, 0), Position(0, 1), Position(1, 0), Position(1, 1)]
-        }
         self.move(0, 4)
 
 class SBlock(Block):
+    rotations = build_rotations({
+        0: [(0, 1), (0, 2), (1, 0), (1, 1)],
+        1: [(0, 1), (1, 1), (1, 2), (2, 2)],
+        2: [(1, 1), (1, 2), (2, 0), (2, 1)],
+        3: [(0, 0), (1, 0), (1, 1), (2, 1)]
+    })
+
     def __init__(self):
         super().__init__(id = 5)
-        self.cells = {
-            0: [Position(0, 1), Position(0, 2), Position(1, 0), Position(1, 1)],
-            1: [Position(0, 1), Position(1, 1), Position(1, 2), Position(2, 2)],
-            2: [Position(1, 1), Position(1, 2), Position(2, 0), Position(2, 1)],
-            3: [Position(0, 0), Position(1, 0), Position(1, 1), Position(2, 1)]
-        }
         self.move(0, 3)
 
 class TBlock(Block):
+    rotations = build_rotations({
+        0: [(0, 1), (1, 0), (1, 1), (1, 2)],
+        1: [(0, 1), (1, 1), (1, 2), (2, 1)],
+        2: [(1, 0), (1, 1), (1, 2), (2, 1)],
+        3: [(0, 1), (1, 0), (1, 1), (2, 1)]
+    })
+
     def __init__(self):
         super().__init__(id = 6)
-        self.cells = {
-            0: [Position(0, 1), Position(1, 0), Position(1, 1), Position(1, 2)],
-            1: [Position(0, 1), Position(1, 1), Position(1, 2), Position(2, 1)],
-            2: [Position(1, 0), Position(1, 1), Position(1, 2), Position(2, 1)],
-            3: [Position(0, 1), Position(1, 0), Position(1, 1), Position(2, 1)]
-        }
         self.move(0, 3)
 
 class ZBlock(Block):
+    rotations = build_rotations({
+        0: [(0, 0), (0, 1), (1, 1), (1, 2)],
+        1: [(0, 2), (1, 1), (1, 2), (2, 1)],
+        2: [(1, 0), (1, 1), (2, 1), (2, 2)],
+        3: [(0, 1), (1, 0), (1, 1), (2, 0)]
+    })
+
     def __init__(self):
         super().__init__(id = 7)
-        self.cells = {
-            0: [Position(0, 0), Position(0, 1), Position(1, 1), Position(1, 2)],
-            1: [Position(0, 2), Position(1, 1), Position(1, 2), Position(2, 1)],
-            2: [Position(1, 0), Position(1, 1), Position(2, 1), Position(2, 2)],
-            3: [Position(0, 1), Position(1, 0), Position(1, 1), Position(2, 0)]
-        }
         self.move(0, 3)
\ No newline at end of file
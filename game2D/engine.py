@@ -0,0 +1,214 @@
+from grid import Grid
+from blocks import *
+import random
+
+# Actions accepted by Engine.step / Engine.apply_action
+NOOP = 0
+MOVE_LEFT = 1
+MOVE_RIGHT = 2
+SOFT_DROP = 3
+ROTATE = 4
+HARD_DROP = 5
+
+# main.py runs at 60 FPS and the old gravity timer fired every 200 ms
+GRAVITY_FRAMES = 12
+
+# One of each piece per bag, ordered by block id
+BLOCK_TYPES = (LBlock, JBlock, IBlock, OBlock, SBlock, TBlock, ZBlock)
+
+def rotation_inside(grid, rotation, row_offset, column_offset):
+    return (row_offset + rotation.min_row >= 0
+        and row_offset + rotation.max_row < grid.num_rows
+        and column_offset + rotation.min_column >= 0
+        and column_offset + rotation.max_column < grid.num_cols)
+
+def can_place(grid, rotation, row_offset, column_offset):
+    return (rotation_inside(grid, rotation, row_offset, column_offset)
+        and grid.fits(rotation, row_offset, column_offset))
+
+def landing_row(grid, rotation, row_offset, column_offset):
+    """Row offset where a piece dropped from this position comes to rest.
+
+    Read straight off the grid's column heights; only a piece already
+    tucked below the skyline falls back to stepping down row by row.
+    """
+    landing = grid.num_rows
+    for column, bottom in rotation.bottoms:
+        landing = min(landing, grid.num_rows - grid.heights[column + column_offset] - 1 - bottom)
+    if landing < row_offset:
+        landing = row_offset
+        while can_place(grid, rotation, landing + 1, column_offset):
+            landing += 1
+    return landing
+
+def find_placements(grid, block):
+    """Every distinct final resting place of `block` on `grid`.
+
+    A placement is reachable if the piece can rotate in place, slide
+    sideways to the column and then drop. Returns a list of
+    (rotation_state, row_offset, column_offset) tuples, one per distinct
+    set of final cells.
+    """
+    row = block.row_offset
+    placements = []
+    seen = set()
+    for turns in range(len(block.rotations)):
+        rotation_state = (block.rotation_state + turns) % len(block.rotations)
+        rotation = block.rotations[rotation_state]
+        if not can_place(grid, rotation, row, block.column_offset):
+            break
+        columns = [block.column_offset]
+        for direction in (-1, 1):
+            column = block.column_offset + direction
+            while can_place(grid, rotation, row, column):
+                columns.append(column)
+                column += direction
+        for column in columns:
+            landing = landing_row(grid, rotation, row, column)
+            cells = frozenset((tile_row + landing, tile_column + column) for tile_row, tile_column in rotation.tiles)
+            if cells not in seen:
+                seen.add(cells)
+                placements.append((rotation_state, landing, column))
+    return placements
+
+class Engine:
+    """Pure game rules: board, pieces, bag, scoring and lock/clear.
+
+    Nothing here imports pygame, so the rules can run headless and as fast
+    as the CPU allows. Time is counted in frames: every call to step()
+    is one frame and gravity pulls the piece down every `gravity_frames`.
+
+    Pieces come from a per-game RNG seeded with `seed` (a random one if not
+    given), and every applied action is logged as (frame, action) in
+    input_log, so a game can be replayed exactly from the two (see replay.py).
+    """
+
+    def __init__(self, grid=None, gravity_frames=GRAVITY_FRAMES, seed=None):
+        # Any object with the Grid interface works here, e.g. BitboardGrid
+        self.grid = grid if grid is not None else Grid()
+        self.gravity_frames = gravity_frames
+        self.seed = seed if seed is not None else random.getrandbits(64)
+        self.rng = random.Random(self.seed)
+        self.frame = 0
+        self.input_log = []
+        self.bag = []
+        self.current_block = self.get_random_block()
+        self.next_block = self.get_random_block()
+        self.game_over = False
+        self.score = 0
+
+    def update_score(self, lines_cleared, move_down_points):
+        if lines_cleared == 1:
+            self.score += 100
+        elif lines_cleared == 2:
+            self.score += 300
+        elif lines_cleared == 3:
+            self.score += 500
+        self.score += move_down_points
+
+    def get_random_block(self):
+        if len(self.bag) == 0:
+            self.bag = list(BLOCK_TYPES)
+            self.rng.shuffle(self.bag)
+        return self.bag.pop()()
+
+    def move_left(self):
+        self.current_block.move(0, -1)
+        if not self.block_inside() or not self.block_fits():
+            self.current_block.move(0, 1)
+
+    def move_right(self):
+        self.current_block.move(0, 1)
+        if not self.block_inside() or not self.block_fits():
+            self.current_block.move(0, -1)
+
+    def move_down(self):
+        self.current_block.move(1, 0)
+        if not self.block_inside() or not self.block_fits():
+            self.current_block.move(-1, 0)
+            self.lock_block()
+
+    def soft_drop(self):
+        self.move_down()
+        self.update_score(0, 1)
+
+    def hard_drop(self):
+        # Scores one point per row, the same as soft dropping all the way
+        rows = self.get_ghost_row() - self.current_block.row_offset
+        self.current_block.move(rows, 0)
+        self.update_score(0, rows)
+        self.lock_block()
+
+    def lock_block(self):
+        block = self.current_block
+        for row, column in block.get_rotation().tiles:
+            self.grid.set_cell(row + block.row_offset, column + block.column_offset, block.id)
+        self.current_block = self.next_block
+        self.next_block = self.get_random_block()
+        rows_cleared = self.grid.clear_full_rows()
+        if rows_cleared > 0:
+            self.update_score(rows_cleared, 0)
+        if not self.block_fits():
+            self.game_over = True
+
+    def reset(self, seed=None):
+        self.grid.reset()
+        self.seed = seed if seed is not None else random.getrandbits(64)
+        self.rng = random.Random(self.seed)
+        self.frame = 0
+        self.input_log = []
+        self.bag = []
+        self.current_block = self.get_random_block()
+        self.next_block = self.get_random_block()
+        self.score = 0
+        self.game_over = False
+
+    def block_fits(self):
+        block = self.current_block
+        return self.grid.fits(block.get_rotation(), block.row_offset, block.column_offset)
+
+    def rotate(self):
+        self.current_block.rotate()
+        if not self.block_inside() or not self.block_fits():
+            self.current_block.undo_rotation()
+
+    def block_inside(self):
+        block = self.current_block
+        return rotation_inside(self.grid, block.get_rotation(), block.row_offset, block.column_offset)
+
+    def get_ghost_row(self):
+        block = self.current_block
+        return landing_row(self.grid, block.get_rotation(), block.row_offset, block.column_offset)
+
+    def get_placements(self, block=None):
+        return find_placements(self.grid, block if block is not None else self.current_block)
+
+    def apply_action(self, action):
+        if self.game_over or action == NOOP:
+            return
+        self.input_log.append((self.frame, action))
+        if action == MOVE_LEFT:
+            self.move_left()
+        elif action == MOVE_RIGHT:
+            self.move_right()
+        elif action == SOFT_DROP:
+            self.soft_drop()
+        elif action == ROTATE:
+            self.rotate()
+        elif action == HARD_DROP:
+            self.hard_drop()
+
+    def step(self, action=NOOP):
+        """Apply `action`, then advance one frame of gravity.
+
+        Returns False once the game is over, like game3D's Game.update.
+        """
+        if self.game_over:
+            return False
+        self.apply_action(action)
+        if self.game_over:
+            return False
+        self.frame += 1
+        if self.frame % self.gravity_frames == 0:
+            self.move_down()
+        return not self.game_over
@@ -1,100 +1,8 @@
-from grid import Grid
-from blocks import *
-import random
-import pygame
+from engine import Engine
+import renderer
 
-class Game:
-    def __init__(self):
-        self.grid = Grid()
-        self.blocks = [IBlock(), JBlock(), LBlock(), OBlock(), SBlock(), TBlock(), ZBlock()]
-        self.current_block = self.get_random_block()
-        self.next_block = self.get_random_block()
-        self.game_over = False
-        self.score = 0
-
-
-    def update_score(self, lines_cleared, move_down_points):
-        if lines_cleared == 1:
-            self.score += 100
-        elif lines_cleared == 2:
-            self.score += 300
-        elif lines_cleared == 3:
-            self.score += 500
-        self.score += move_down_points
-
-    def get_random_block(self):
-        if len(self.blocks) == 0:
-            self.blocks = [IBlock(), JBlock(), LBlock(), OBlock(), SBlock(), TBlock(), ZBlock()]
-        block = random.choice(self.blocks)
-        self.blocks.remove(block)
-        return block
-
-    def move_left(self):
-        self.current_block.move(0, -1)
-        if not self.block_inside() or not self.block_fits():
-            self.current_block.move(0, 1)
-
-    def move_right(self):
-        self.current_block.move(0, 1)
-        if not self.block_inside() or not self.block_fits():
-            self.current_block.move(0, -1)
-
-    def move_down(self):
-        self.current_block.move(1, 0)
-        if not self.block_inside() or not self.block_fits():
-            self.current_block.move(-1, 0)
-            self.lock_block()
-
-    def lock_block(self):
-        tiles = self.current_block.get_cell_positions()
-        for position in tiles:
-            self.grid.grid[position.row][position.column] = self.current_block.id
-        self.current_block = self.next_block
-        self.next_block = self.get_random_block()
-        rows_cleared = self.grid.clear_full_rows()
-        if rows_cleared > 0:
-            # Sound handled by SoundManager in main.py
-            self.update_score(rows_cleared, 0)
-        if not self.block_fits():
-            self.game_over = True
-
-    def reset(self):
-        self.grid.reset()
-        self.blocks = [IBlock(), JBlock(), LBlock(), OBlock(), SBlock(), TBlock(), ZBlock()]
-        self.current_block = self.get_random_block()
-        self.next_block = self.get_random_block()
-        self.score = 0
-        self.game_over = False
-
-    def block_fits(self):
-        tiles = self.current_block.get_cell_positions()
-        for tile in tiles:
-            if not self.grid.is_empty(tile.row, tile.column):
-                return False
-        return True
-
-    def rotate(self):
-        self.current_block.rotate()
-        if not self.block_inside() or not self.block_fits():
-            self.current_block.undo_rotation()
-        else:
-            # Sound handled by SoundManager in main.py
-            pass
-
-    def block_inside(self):
-        tiles = self.current_block.get_cell_positions()
-        for tile in tiles:
-            if not self.grid.is_inside(tile.row, tile.column):
-                return False
-        return True
+class Game(Engine):
+    """Engine plus pygame drawing, used by main.py and Menu."""
 
     def draw(self, screen):
-        self.grid.draw(screen)
-        self.current_block.draw(screen, 11, 11)
-
-        if self.next_block.id == 3:
-            self.next_block.draw(screen, 255, 290)
-        elif self.next_block.id == 4:
-            self.next_block.draw(screen, 255, 280)
-        else:
-            self.next_block.draw(screen, 270, 270)
+        renderer.draw_game(screen, self)
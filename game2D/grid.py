@@ -1,13 +1,11 @@
-import pygame
-from colors import Colors
-
 class Grid:
 	def __init__(self):
 		self.num_rows = 20
 		self.num_cols = 10
 		self.cell_size = 30
 		self.grid = [[0 for j in range(self.num_cols)] for i in range(self.num_rows)]
-		self.colors = Colors.get_cell_colors()
+		# Skyline index: number of rows from the floor up to each column's top cell
+		self.heights = [0] * self.num_cols
 
 	def print_grid(self):
 		for row in range(self.num_rows):
@@ -25,6 +23,30 @@ class Grid:
 			return True
 		return False
 
+	def fits(self, rotation, row_offset, column_offset):
+		# rotation is a RotationTable already known to be inside the grid
+		for row, column in rotation.tiles:
+			if self.grid[row + row_offset][column + column_offset] != 0:
+				return False
+		return True
+
+	def get_cell(self, row, column):
+		return self.grid[row][column]
+
+	def set_cell(self, row, column, value):
+		self.grid[row][column] = value
+		if value != 0:
+			self.heights[column] = max(self.heights[column], self.num_rows - row)
+		elif self.heights[column] == self.num_rows - row:
+			self.update_height(column)
+
+	def update_height(self, column, start_row=0):
+		self.heights[column] = 0
+		for row in range(start_row, self.num_rows):
+			if self.grid[row][column] != 0:
+				self.heights[column] = self.num_rows - row
+				break
+
 	def is_row_full(self, row):
 		for column in range(self.num_cols):
 			if self.grid[row][column] == 0:
@@ -42,23 +64,25 @@ class Grid:
 
 	def clear_full_rows(self):
 		completed = 0
-		for row in range(self.num_rows-1, 0, -1):
+		for row in range(self.num_rows-1, -1, -1):
 			if self.is_row_full(row):
 				self.clear_row(row)
 				completed += 1
 			elif completed > 0:
 				self.move_row_down(row, completed)
+		if completed > 0:
+			# Full rows span every column, so no column can end up taller than
+			# height - completed; scan down from there to the new top cell
+			for column in range(self.num_cols):
+				self.update_height(column, self.num_rows - self.heights[column] + completed)
 		return completed
 
 	def reset(self):
 		for row in range(self.num_rows):
 			for column in range(self.num_cols):
 				self.grid[row][column] = 0
+		self.heights = [0] * self.num_cols
 
 	def draw(self, screen):
-		for row in range(self.num_rows):
-			for column in range(self.num_cols):
-				cell_value = self.grid[row][column]
-				cell_rect = pygame.Rect(column*self.cell_size + 11, row*self.cell_size + 11,
-				self.cell_size -1, self.cell_size -1)
-				pygame.draw.rect(screen, self.colors[cell_value], cell_rect)
+		from renderer import draw_grid
+		draw_grid(screen, self)
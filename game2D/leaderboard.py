@@ -1,22 +1,87 @@
 import json
 import os
+import sqlite3
 
-LEADERBOARD_FILE = "leaderboard.json"
+LEADERBOARD_FILE = os.path.join(os.path.dirname(__file__), "leaderboard.json")
+LEADERBOARD_DB = os.path.join(os.path.dirname(__file__), "leaderboard.db")
 MAX_ENTRIES = 5
+# Query results kept between writes; beyond this the oldest one is dropped
+MAX_CACHED = 32
 
-def load_leaderboard():
-    if not os.path.exists(LEADERBOARD_FILE):
-        return []
-    with open(LEADERBOARD_FILE, "r") as f:
-        return json.load(f)
+class LeaderboardStore:
+    """Full score history in SQLite, with cached query results.
+
+    Every score is kept; reads go through a small in-memory cache that is
+    dropped on each write, so menus can ask for the top scores every frame.
+    The cache holds immutable rows and every call returns new entries, so
+    callers may modify what they get. On first run the old JSON
+    leaderboard is imported.
+    """
+
+    def __init__(self, path=LEADERBOARD_DB, json_path=LEADERBOARD_FILE):
+        self.connection = sqlite3.connect(path)
+        self.cache = {}
+        with self.connection:
+            self.connection.execute(
+                "CREATE TABLE IF NOT EXISTS scores ("
+                "id INTEGER PRIMARY KEY, name TEXT NOT NULL, score INTEGER NOT NULL, "
+                "created_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP)")
+            self.connection.execute("CREATE INDEX IF NOT EXISTS scores_by_score ON scores (score DESC)")
+            self.connection.execute("CREATE INDEX IF NOT EXISTS scores_by_name ON scores (name, score DESC)")
+        # user_version 0 means this database has never seen the JSON file
+        if self.connection.execute("PRAGMA user_version").fetchone()[0] == 0:
+            self.import_json(json_path)
+
+    def import_json(self, json_path):
+        entries = []
+        if os.path.exists(json_path):
+            with open(json_path, "r") as f:
+                entries = json.load(f)
+        with self.connection:
+            self.connection.executemany("INSERT INTO scores (name, score) VALUES (?, ?)",
+                [(entry["name"], entry["score"]) for entry in entries])
+            self.connection.execute("PRAGMA user_version = 1")
+        self.cache.clear()
+
+    def add_score(self, name, score):
+        with self.connection:
+            self.connection.execute("INSERT INTO scores (name, score) VALUES (?, ?)", (name, score))
+        self.cache.clear()
+
+    def cached(self, key, query, *parameters):
+        if key not in self.cache:
+            self.cache[key] = tuple(self.connection.execute(query, parameters))
+            if len(self.cache) > MAX_CACHED:
+                del self.cache[next(iter(self.cache))]
+        return self.cache[key]
+
+    def top_scores(self, limit=MAX_ENTRIES):
+        rows = self.cached(("top", limit),
+            "SELECT name, score FROM scores ORDER BY score DESC, id LIMIT ?", limit)
+        return [{"name": name, "score": score} for name, score in rows]
 
-def save_leaderboard(leaderboard):
-    with open(LEADERBOARD_FILE, "w") as f:
-        json.dump(leaderboard, f, indent=4)
+    def top_players(self, limit=MAX_ENTRIES):
+        # Each player's best score, best players first
+        rows = self.cached(("players", limit),
+            "SELECT name, MAX(score) AS best FROM scores GROUP BY name ORDER BY best DESC, MIN(id) LIMIT ?", limit)
+        return [{"name": name, "score": score} for name, score in rows]
+
+    def player_best(self, name):
+        return self.cached(("best", name), "SELECT MAX(score) FROM scores WHERE name = ?", name)[0][0]
+
+    def close(self):
+        self.connection.close()
+
+_store = None
+
+def get_store():
+    global _store
+    if _store is None:
+        _store = LeaderboardStore()
+    return _store
+
+def load_leaderboard():
+    return get_store().top_scores(MAX_ENTRIES)
 
 def add_score(name, score):
-    leaderboard = load_leaderboard()
-    leaderboard.append({"name": name, "score": score})
-    leaderboard.sort(key=lambda x: x["score"], reverse=True)
-    leaderboard = leaderboard[:MAX_ENTRIES]
-    save_leaderboard(leaderboard)
+    get_store().add_score(name, score)
@@ -0,0 +1,172 @@
+import pygame
+from colors import Colors
+
+# Top-left corner of the board on screen
+BOARD_OFFSET = 11
+
+# Tile keys for TileAtlas and DirtyRenderer: 0-7 are solid cells by color
+# id, GHOST + id is the landing outline of block `id` over an empty cell
+GHOST = 8
+
+class TileAtlas:
+    """Pre-rendered tile surfaces indexed by tile key (see GHOST above).
+
+    Tiles are drawn once per color at the current cell size and blitted
+    from then on. The cell colors are read from Colors when the atlas is
+    created; call invalidate() after changing them. Otherwise the atlas
+    rebuilds itself only when the cell size or the style changes; "bevel"
+    gives solid tiles a lit top left edge and a shaded bottom right edge.
+    """
+
+    def __init__(self, style="flat"):
+        self.style = style
+        self.colors = Colors.get_cell_colors()
+        self.key = None
+        self.tiles = []
+
+    def invalidate(self):
+        self.colors = Colors.get_cell_colors()
+        self.key = None
+
+    def get_tiles(self, cell_size):
+        key = (cell_size, self.style)
+        if key != self.key:
+            self.build(cell_size, self.colors)
+            self.key = key
+        return self.tiles
+
+    def build(self, cell_size, colors):
+        size = (cell_size - 1, cell_size - 1)
+        solid = []
+        ghost = []
+        for color in colors:
+            tile = pygame.Surface(size)
+            tile.fill(color)
+            if self.style == "bevel":
+                light = tuple(min(255, channel + 60) for channel in color)
+                dark = tuple(channel * 3 // 5 for channel in color)
+                edge = max(2, cell_size // 10)
+                pygame.draw.rect(tile, light, (0, 0, size[0], edge))
+                pygame.draw.rect(tile, light, (0, 0, edge, size[1]))
+                pygame.draw.rect(tile, dark, (0, size[1] - edge, size[0], edge))
+                pygame.draw.rect(tile, dark, (size[0] - edge, 0, edge, size[1]))
+            solid.append(tile)
+
+            tile = pygame.Surface(size)
+            tile.fill(colors[0])
+            pygame.draw.rect(tile, color, tile.get_rect(), 2)
+            ghost.append(tile)
+        self.tiles = solid + ghost
+
+# Shared by every draw call so tiles are only rendered once
+atlas = TileAtlas()
+
+def draw_grid(screen, grid):
+    tiles = atlas.get_tiles(grid.cell_size)
+    screen.blits([(tiles[grid.get_cell(row, column)],
+        (column*grid.cell_size + BOARD_OFFSET, row*grid.cell_size + BOARD_OFFSET))
+        for row in range(grid.num_rows) for column in range(grid.num_cols)], False)
+
+def draw_block(screen, block, offset_x, offset_y):
+    tile = atlas.get_tiles(block.cell_size)[block.id]
+    screen.blits([(tile, (offset_x + (column + block.column_offset) * block.cell_size,
+        offset_y + (row + block.row_offset) * block.cell_size))
+        for row, column in block.get_rotation().tiles], False)
+
+def draw_ghost(screen, block, row_offset):
+    # Outline of where the block will land, read from the grid's skyline
+    tile = atlas.get_tiles(block.cell_size)[GHOST + block.id]
+    screen.blits([(tile, (BOARD_OFFSET + (column + block.column_offset) * block.cell_size,
+        BOARD_OFFSET + (row + row_offset) * block.cell_size))
+        for row, column in block.get_rotation().tiles], False)
+
+def draw_game(screen, game):
+    draw_grid(screen, game.grid)
+    if not game.game_over:
+        draw_ghost(screen, game.current_block, game.get_ghost_row())
+    draw_block(screen, game.current_block, BOARD_OFFSET, BOARD_OFFSET)
+
+    offset_x, offset_y = next_block_offset(game.next_block)
+    draw_block(screen, game.next_block, offset_x, offset_y)
+
+def next_block_offset(block):
+    if block.id == 3:
+        return 255, 290
+    elif block.id == 4:
+        return 255, 280
+    return 270, 270
+
+def block_bounds(block, offset_x, offset_y):
+    rotation = block.get_rotation()
+    return pygame.Rect(offset_x + (rotation.min_column + block.column_offset) * block.cell_size,
+        offset_y + (rotation.min_row + block.row_offset) * block.cell_size,
+        (rotation.max_column - rotation.min_column + 1) * block.cell_size,
+        (rotation.max_row - rotation.min_row + 1) * block.cell_size)
+
+class DirtyRenderer:
+    """Draws the playing screen, touching only what changed since last frame.
+
+    It remembers the tile shown in every board cell (settled cells, ghost
+    and falling piece), the score and the next block, redraws just the
+    cells and UI regions that differ and returns their rects for
+    pygame.display.update. Call invalidate() whenever something else has
+    drawn over the screen so the next frame is drawn in full.
+    """
+
+    def __init__(self, screen, menu):
+        self.screen = screen
+        self.menu = menu
+        self.invalidate()
+
+    def invalidate(self):
+        self.tiles = None
+        self.score = None
+        self.next_id = None
+        self.next_rect = None
+
+    def compose(self, game):
+        grid = game.grid
+        tiles = [grid.get_cell(row, column) for row in range(grid.num_rows) for column in range(grid.num_cols)]
+        if not game.game_over:
+            block = game.current_block
+            tile_offsets = block.get_rotation().tiles
+            ghost_row = game.get_ghost_row()
+            for row, column in tile_offsets:
+                tiles[(row + ghost_row) * grid.num_cols + column + block.column_offset] = GHOST + block.id
+            for row, column in tile_offsets:
+                tiles[(row + block.row_offset) * grid.num_cols + column + block.column_offset] = block.id
+        return tiles
+
+    def draw(self, game):
+        tiles = self.compose(game)
+        offset_x, offset_y = next_block_offset(game.next_block)
+        next_rect = block_bounds(game.next_block, offset_x, offset_y)
+        if self.tiles is None:
+            self.menu.draw_game_ui(game)
+            self.tiles, self.score = tiles, game.score
+            self.next_id, self.next_rect = game.next_block.id, next_rect
+            return [self.screen.get_rect()]
+
+        grid = game.grid
+        atlas_tiles = atlas.get_tiles(grid.cell_size)
+        dirty = []
+        blits = []
+        for index, tile in enumerate(tiles):
+            if tile != self.tiles[index]:
+                row, column = divmod(index, grid.num_cols)
+                position = (column*grid.cell_size + BOARD_OFFSET, row*grid.cell_size + BOARD_OFFSET)
+                blits.append((atlas_tiles[tile], position))
+                dirty.append(pygame.Rect(position, (grid.cell_size -1, grid.cell_size -1)))
+        self.screen.blits(blits, False)
+        self.tiles = tiles
+
+        if game.score != self.score:
+            dirty.append(self.menu.draw_score(game))
+            self.score = game.score
+
+        if game.next_block.id != self.next_id:
+            self.screen.fill(Colors.dark_blue, self.next_rect)
+            draw_block(self.screen, game.next_block, offset_x, offset_y)
+            dirty.append(self.next_rect.union(next_rect))
+            self.next_id, self.next_rect = game.next_block.id, next_rect
+        return dirty
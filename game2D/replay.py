@@ -0,0 +1,117 @@
+import argparse
+import os
+import struct
+import time
+from engine import Engine
+
+# main.py saves every finished game here
+REPLAY_DIR = os.path.join(os.path.dirname(__file__), "replays")
+
+# Header: magic, format version, seed, gravity frames, final frame, number
+# of inputs, final score. Inputs follow as one varint each.
+MAGIC = b"T2RP"
+VERSION = 1
+HEADER = struct.Struct("<4sBQHIII")
+
+# Actions fit in the low three bits of each input's varint
+ACTION_BITS = 3
+
+class Replay:
+    """A recorded 2D game: the piece seed plus the frame-indexed input log.
+
+    That is all it takes to reproduce a game exactly, since Engine is
+    deterministic given both. The final frame and score are stored too so
+    a replay can verify itself.
+    """
+
+    def __init__(self, seed, gravity_frames, inputs, frames, score):
+        self.seed = seed
+        self.gravity_frames = gravity_frames
+        self.inputs = inputs
+        self.frames = frames
+        self.score = score
+
+    @classmethod
+    def from_engine(cls, engine):
+        return cls(engine.seed, engine.gravity_frames, list(engine.input_log), engine.frame, engine.score)
+
+    def encode(self):
+        data = bytearray(HEADER.pack(MAGIC, VERSION, self.seed, self.gravity_frames,
+            self.frames, len(self.inputs), self.score))
+        last_frame = 0
+        for frame, action in self.inputs:
+            # Frame deltas are usually small, so most inputs take one byte
+            value = ((frame - last_frame) << ACTION_BITS) | action
+            last_frame = frame
+            while value >= 0x80:
+                data.append((value & 0x7F) | 0x80)
+                value >>= 7
+            data.append(value)
+        return bytes(data)
+
+    @classmethod
+    def decode(cls, data):
+        magic, version, seed, gravity_frames, frames, count, score = HEADER.unpack_from(data)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError("not a version %d 2D Tetris replay" % VERSION)
+        inputs = []
+        position = HEADER.size
+        frame = 0
+        for i in range(count):
+            value = 0
+            shift = 0
+            while True:
+                byte = data[position]
+                position += 1
+                value |= (byte & 0x7F) << shift
+                shift += 7
+                if byte < 0x80:
+                    break
+            frame += value >> ACTION_BITS
+            inputs.append((frame, value & ((1 << ACTION_BITS) - 1)))
+        return cls(seed, gravity_frames, inputs, frames, score)
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            f.write(self.encode())
+
+    @classmethod
+    def load(cls, path):
+        with open(path, "rb") as f:
+            return cls.decode(f.read())
+
+def save_game(engine, directory=REPLAY_DIR):
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, time.strftime("%Y%m%d-%H%M%S") + "-%d.replay" % engine.score)
+    Replay.from_engine(engine).save(path)
+    return path
+
+def play(replay, grid=None):
+    """Re-run `replay` headless as fast as possible and return the Engine."""
+    engine = Engine(grid, replay.gravity_frames, replay.seed)
+    inputs = replay.inputs
+    index = 0
+    while not engine.game_over:
+        while index < len(inputs) and inputs[index][0] == engine.frame:
+            engine.apply_action(inputs[index][1])
+            index += 1
+        if engine.frame >= replay.frames:
+            break
+        engine.step()
+    return engine
+
+def main():
+    parser = argparse.ArgumentParser(description="Re-run a 2D Tetris replay headless and verify its score.")
+    parser.add_argument("path")
+    args = parser.parse_args()
+
+    replay = Replay.load(args.path)
+    start = time.perf_counter()
+    engine = play(replay)
+    elapsed = time.perf_counter() - start
+    speedup = replay.frames / 60 / elapsed if elapsed > 0 else float("inf")
+    print(f"{replay.frames} frames, {len(replay.inputs)} inputs in {elapsed:.3f}s ({speedup:.0f}x real time)")
+    print(f"score {engine.score}, recorded {replay.score}: {'OK' if engine.score == replay.score else 'MISMATCH'}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+# game2D and game3D each run as a separate script with only their own
+# directory on sys.path, so both carry this module. Keep the copies identical.
+from collections import OrderedDict
+import pygame
+
+# Rendered text surfaces kept before the least recently used one is dropped
+MAX_SURFACES = 256
+
+_fonts = {}
+_surfaces = OrderedDict()
+
+def get_font(size, face=None):
+    """Shared Font for (face, size); face None is pygame's default font."""
+    key = (face, size)
+    font = _fonts.get(key)
+    if font is None:
+        font = _fonts[key] = pygame.font.Font(face, size)
+    return font
+
+def render_text(text, color, size, face=None):
+    """Antialiased surface for text, rendered once per (text, color, size, face).
+
+    Changing values such as the score get a new surface only when the text
+    changes. The surface is shared between callers, so blit it, never draw
+    on it.
+    """
+    key = (text, tuple(color), size, face)
+    surface = _surfaces.get(key)
+    if surface is None:
+        surface = _surfaces[key] = get_font(size, face).render(text, True, color)
+        if len(_surfaces) > MAX_SURFACES:
+            _surfaces.popitem(last=False)
+    else:
+        _surfaces.move_to_end(key)
+    return surface
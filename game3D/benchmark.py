@@ -0,0 +1,69 @@
+import argparse
+import random
+import time
+import numpy as np
+import pygame
+from block import Block
+from camera import Camera
+from surface import SurfaceMesh
+from tetromino import Tetromino, PALETTE
+from renderer import RENDERERS
+from vector3d import Vector3D
+from constants import GRID_SIZE
+
+def build_well(width, height, depth, fill, seed):
+    """下面 fill 比例的層隨機填滿八成左右，每層都留洞，不會被消掉"""
+    rng = np.random.default_rng(seed)
+    grid = np.zeros((width, height, depth), dtype=np.uint8)
+    layers = int(height * fill)
+    filled = rng.random((width, layers, depth)) < 0.8
+    filled[rng.integers(width, size=layers), np.arange(layers), rng.integers(depth, size=layers)] = False
+    grid[:, :layers, :][filled] = rng.integers(1, len(PALETTE), size=filled.sum())
+    return grid, layers
+
+def run(backend, grid, layers, frames, moving_camera, size):
+    width, height, depth = grid.shape
+    random.seed(0)
+    screen = pygame.Surface(size)
+    surface = SurfaceMesh(grid, PALETTE)
+    target = Vector3D(width * GRID_SIZE / 2, height * GRID_SIZE / 2, depth * GRID_SIZE / 2)
+    camera = Camera(*size, target=target, distance=max(size) * max(width, height, depth) / 16)
+    renderer = RENDERERS[backend]()
+    tetromino = Tetromino()
+    tetromino.position = Vector3D(width // 2, height - 3, depth // 2)
+    tetromino.blocks = tetromino.create_blocks()
+    ghost = [Block(block.position.x, (layers + 0.5) * GRID_SIZE + block.position.y - tetromino.blocks[0].position.y,
+        block.position.z, (180, 180, 180)) for block in tetromino.blocks]
+    start = time.perf_counter()
+    for frame in range(frames):
+        if moving_camera:
+            camera.rotation_y += 0.01
+            camera.update_position()
+        else:
+            # 攝像機不動，方塊上下移動
+            tetromino.move(0, -1 if frame % 8 < 4 else 1, 0)
+        renderer.draw(screen, camera, surface, tetromino.blocks, ghost)
+    return (time.perf_counter() - start) / frames * 1000
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the 3D render backends on wells of several sizes.")
+    parser.add_argument("--sizes", nargs="+", default=["6x16x6", "10x20x10", "16x24x16"],
+        help="well sizes as WIDTHxHEIGHTxDEPTH")
+    parser.add_argument("--fill", type=float, default=0.5, help="fraction of layers filled")
+    parser.add_argument("--frames", type=int, default=60)
+    parser.add_argument("--screen", default="800x600")
+    args = parser.parse_args()
+
+    pygame.init()
+    size = tuple(int(n) for n in args.screen.split("x"))
+    print(f"{'well':>10} {'backend':>8} {'moving ms':>10} {'idle ms':>8} {'quads':>6}")
+    for well in args.sizes:
+        grid, layers = build_well(*(int(n) for n in well.split("x")), args.fill, seed=1)
+        quads = SurfaceMesh(grid, PALETTE).count_quads()
+        for backend in RENDERERS:
+            moving = run(backend, grid, layers, args.frames, True, size)
+            idle = run(backend, grid, layers, args.frames, False, size)
+            print(f"{well:>10} {backend:>8} {moving:>10.2f} {idle:>8.2f} {quads:>6}")
+
+if __name__ == "__main__":
+    main()
@@ -1,80 +1,65 @@
+import numpy as np
 from vector3d import Vector3D
 from constants import GRID_SIZE
+
+# 單位立方體的 8 個頂點，第 i 個頂點的 x/y/z 分別取 i 的第 0/1/2 位元（0 為負側，1 為正側）
+CUBE_CORNERS = np.array([[(i & 1) * 2 - 1, (i >> 1 & 1) * 2 - 1, (i >> 2 & 1) * 2 - 1] for i in range(8)]) * (GRID_SIZE // 2)
+
+# 每個面的頂點索引（沿用原本的繞行順序）和法向量
+CUBE_FACES = {
+    'front': ((4, 5, 7, 6), (0, 0, 1)),
+    'back': ((1, 0, 2, 3), (0, 0, -1)),
+    'left': ((0, 4, 6, 2), (-1, 0, 0)),
+    'right': ((5, 1, 3, 7), (1, 0, 0)),
+    'top': ((6, 7, 3, 2), (0, 1, 0)),
+    'bottom': ((0, 1, 5, 4), (0, -1, 0)),
+}
+
+# 每個面在遮罩中的位元，順序同 CUBE_FACES（見 surface.py）
+FACE_BITS = {name: 1 << bit for bit, name in enumerate(CUBE_FACES)}
+
+# 面中心相對於方塊中心的偏移
+FACE_CENTERS = {name: np.array(normal) * (GRID_SIZE // 2) for name, (_, normal) in CUBE_FACES.items()}
+
 class Block:
     def __init__(self, x, y, z, color):
         self.position = Vector3D(x, y, z)
         self.color = color
-    
-    def get_face_vertices(self, camera):
-        """獲取立方體的面頂點，按深度排序只渲染最前面的面"""
-        size = GRID_SIZE // 2
-
-        # 定義立方體的6個面
-        faces = {
-            'front': [
-                Vector3D(self.position.x - size, self.position.y - size, self.position.z + size),
-                Vector3D(self.position.x + size, self.position.y - size, self.position.z + size),
-                Vector3D(self.position.x + size, self.position.y + size, self.position.z + size),
-                Vector3D(self.position.x - size, self.position.y + size, self.position.z + size)
-            ],
-            'back': [
-                Vector3D(self.position.x + size, self.position.y - size, self.position.z - size),
-                Vector3D(self.position.x - size, self.position.y - size, self.position.z - size),
-                Vector3D(self.position.x - size, self.position.y + size, self.position.z - size),
-                Vector3D(self.position.x + size, self.position.y + size, self.position.z - size)
-            ],
-            'left': [
-                Vector3D(self.position.x - size, self.position.y - size, self.position.z - size),
-                Vector3D(self.position.x - size, self.position.y - size, self.position.z + size),
-                Vector3D(self.position.x - size, self.position.y + size, self.position.z + size),
-                Vector3D(self.position.x - size, self.position.y + size, self.position.z - size)
-            ],
-            'right': [
-                Vector3D(self.position.x + size, self.position.y - size, self.position.z + size),
-                Vector3D(self.position.x + size, self.position.y - size, self.position.z - size),
-                Vector3D(self.position.x + size, self.position.y + size, self.position.z - size),
-                Vector3D(self.position.x + size, self.position.y + size, self.position.z + size)
-            ],
-            'top': [
-                Vector3D(self.position.x - size, self.position.y + size, self.position.z + size),
-                Vector3D(self.position.x + size, self.position.y + size, self.position.z + size),
-                Vector3D(self.position.x + size, self.position.y + size, self.position.z - size),
-                Vector3D(self.position.x - size, self.position.y + size, self.position.z - size)
-            ],
-            'bottom': [
-                Vector3D(self.position.x - size, self.position.y - size, self.position.z - size),
-                Vector3D(self.position.x + size, self.position.y - size, self.position.z - size),
-                Vector3D(self.position.x + size, self.position.y - size, self.position.z + size),
-                Vector3D(self.position.x - size, self.position.y - size, self.position.z + size)
-            ]
-        }
 
-        # 計算每個面的深度和法向量，只渲染面向攝像機的面
-        visible_faces = []
-        camera_dir = (self.position - camera.position).normalize()
+    def get_visible_face_names(self, camera_position):
+        """攝像機在方塊哪一側就看得到那一側的面，每軸比較一次，最多三個面"""
+        names = []
+        if camera_position.z > self.position.z:
+            names.append('front')
+        elif camera_position.z < self.position.z:
+            names.append('back')
+        if camera_position.x > self.position.x:
+            names.append('right')
+        elif camera_position.x < self.position.x:
+            names.append('left')
+        if camera_position.y > self.position.y:
+            names.append('top')
+        elif camera_position.y < self.position.y:
+            names.append('bottom')
+        return names
 
-        face_normals = {
-            'front': Vector3D(0, 0, 1),
-            'back': Vector3D(0, 0, -1),
-            'left': Vector3D(-1, 0, 0),
-            'right': Vector3D(1, 0, 0),
-            'top': Vector3D(0, 1, 0),
-            'bottom': Vector3D(0, -1, 0)
-        }
+    def get_face_corners(self, camera_position):
+        """面向攝像機的面，回傳 [(面名稱, 4 個頂點的世界座標 (4, 3))]"""
+        center = (self.position.x, self.position.y, self.position.z)
+        return [(name, CUBE_CORNERS[list(CUBE_FACES[name][0])] + center)
+            for name in self.get_visible_face_names(camera_position)]
 
-        for face_name, vertices in faces.items():
-            normal = face_normals[face_name]
-            # 計算法向量與攝像機方向的點積
-            dot_product = normal.x * camera_dir.x + normal.y * camera_dir.y + normal.z * camera_dir.z
-
-            if dot_product < 0:  # 面向攝像機
-                center = vertices[0] + vertices[1] + vertices[2] + vertices[3]
-                center = Vector3D(center.x / 4, center.y / 4, center.z / 4)
-                try:
-                    depth = camera.project(center)[2]
-                    visible_faces.append((face_name, vertices, depth))
-                except:
-                    continue  # 忽略投影失敗者
+    def get_face_vertices(self, camera):
+        """獲取面向攝像機的面，回傳 [(面名稱, 4 個螢幕座標, 深度)]
 
-        return visible_faces
-        
+        單一方塊看得到的面在螢幕上不會互相重疊，所以不用排序。
+        """
+        names = self.get_visible_face_names(camera.position)
+        if not names:
+            return []
+        center = (self.position.x, self.position.y, self.position.z)
+        # 8 個頂點加上可見面的中心一次投影完
+        points = np.vstack([CUBE_CORNERS, [FACE_CENTERS[name] for name in names]]) + center
+        screen, depth = camera.project_many(points)
+        screen = screen.tolist()
+        return [(name, [screen[i] for i in CUBE_FACES[name][0]], depth[8 + j]) for j, name in enumerate(names)]
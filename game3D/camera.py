@@ -1,4 +1,5 @@
 import math
+import numpy as np
 from vector3d import Vector3D
 from constants import GRID_WIDTH, GRID_HEIGHT, GRID_DEPTH, GRID_SIZE, WINDOW_WIDTH, WINDOW_HEIGHT
 
@@ -13,6 +14,8 @@ class Camera:
         self.rotation_y = rotation_y
         self.mouse_dragging = False
         self.last_mouse_pos = (0, 0)
+        # 每次視角或螢幕大小改變都會加一，讓快取知道要重算
+        self.version = 0
         self.update_position()
     
     def handle_mouse_wheel(self, event):
@@ -27,11 +30,10 @@ class Camera:
         y = self.distance * math.sin(self.rotation_x)
         z = self.distance * math.cos(self.rotation_x) * math.cos(self.rotation_y)
         self.position = Vector3D(self.target.x + x, self.target.y + y, self.target.z + z)
-    
-    def project(self, point):
-        # 3D到2D投影
-        relative = point - self.position
-        
+        self.update_view()
+
+    def update_view(self):
+        """重算攝像機座標系，只在位置或螢幕大小改變時呼叫"""
         # 計算攝像機的觀察方向
         forward = (self.target - self.position).normalize()
         up = Vector3D(0, 1, 0)
@@ -45,7 +47,23 @@ class Camera:
             right.z * forward.x - right.x * forward.z,
             right.x * forward.y - right.y * forward.x
         ).normalize()
-        
+        self.forward = forward
+        self.right = right
+        self.up = up
+        # 給 project_many 用的矩陣，每一列是一個座標軸
+        self.view = np.array([
+            [right.x, right.y, right.z],
+            [up.x, up.y, up.z],
+            [forward.x, forward.y, forward.z]
+        ])
+        self.origin = np.array([self.position.x, self.position.y, self.position.z])
+        self.version += 1
+
+    def project(self, point):
+        # 3D到2D投影
+        relative = point - self.position
+        right, up, forward = self.right, self.up, self.forward
+
         # 轉換到攝像機座標系
         x = relative.x * right.x + relative.y * right.y + relative.z * right.z
         y = relative.x * up.x + relative.y * up.y + relative.z * up.z
@@ -59,6 +77,18 @@ class Camera:
         screen_y = int(-y * factor + self.screen_height // 2)
         
         return (screen_x, screen_y, z)
+
+    def project_many(self, points):
+        """一次投影 (N, 3) 陣列，回傳 (N, 2) 整數螢幕座標和 (N,) 深度"""
+        relative = np.asarray(points, dtype=float).reshape(-1, 3) - self.origin
+        # 和 project 相同的運算順序，結果逐位元一致
+        x, y, z = (relative[:, 0] * axis[0] + relative[:, 1] * axis[1] + relative[:, 2] * axis[2] for axis in self.view)
+        depth = np.where(z <= 0, 0.001, z)
+        factor = self.screen_height * 1.33 / depth
+        screen = np.empty((len(depth), 2), dtype=int)
+        screen[:, 0] = x * factor + self.screen_width // 2
+        screen[:, 1] = -y * factor + self.screen_height // 2
+        return screen, depth
     
     def handle_mouse(self, mouse_buttons, mouse_pos):
         if mouse_buttons[0]:  # 左鍵按下
@@ -0,0 +1,82 @@
+import numpy as np
+import pygame
+from surface import FACE_AXES
+from constants import GRID_SIZE
+
+# 深度差在這以內時算移動中的方塊在前面，免得方塊貼著已放置方塊的邊緣被描邊咬掉；
+# 真正被擋住時兩者至少差半格以上
+DEPTH_BIAS = GRID_SIZE / 4
+
+def crop(array, bounds, rect, fill=np.inf):
+    """array 涵蓋螢幕上 bounds 的範圍，取出 rect 範圍的部分，bounds 外填 fill"""
+    result = np.full((rect.width, rect.height), fill, dtype=array.dtype)
+    overlap = rect.clip(bounds)
+    if overlap.width and overlap.height:
+        result[overlap.x - rect.x:overlap.right - rect.x, overlap.y - rect.y:overlap.bottom - rect.y] = \
+            array[overlap.x - bounds.x:overlap.right - bounds.x, overlap.y - bounds.y:overlap.bottom - bounds.y]
+    return result
+
+def get_depths(camera, axis, plane, x, y):
+    """像素 (x, y) 中心的視線和平面 axis = plane 交點的深度，參數都可以是一維陣列
+
+    深度是攝像機座標的 z，和 Camera.project 的深度相同。視線幾乎和平面平行
+    或交點在攝像機後面時回傳 inf。
+    """
+    factor = camera.screen_height * 1.33
+    a = (x + 0.5 - camera.screen_width // 2) / factor
+    b = -(y + 0.5 - camera.screen_height // 2) / factor
+    right, up, forward = camera.view
+    # 沿攝像機前方的分量為 1 的視線方向，在 axis 上的分量
+    ray = right[axis] * a + up[axis] * b + forward[axis]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        depth = (plane - camera.origin[axis]) / ray
+    return np.where(depth > 0, depth, np.inf)
+
+class DepthBuffer:
+    """由面的編號圖反推每個像素到攝像機的深度
+
+    先把面照畫家演算法的順序、以編號當顏色畫進一張圖，每個像素留下的就是
+    畫面上看得到的那個面，覆蓋的像素和 pygame.draw.polygon 畫出來的完全
+    一樣。面都和座標軸對齊，所以像素的視線和該面所在平面的交點就是深度。
+    """
+
+    def __init__(self, size):
+        self.size = size
+        self.ids = pygame.Surface(size, depth=32)
+
+    def render(self, faces, camera, outline=2, clip=None):
+        """faces 是照繪製順序排好的 [(面名稱, 世界座標頂點 (4, 3))]，outline 是描邊寬度
+
+        回傳 (深度, 範圍)：範圍是 faces 在螢幕上的外框（pygame.Rect），深度的
+        形狀是 (寬, 高)，沒有面的像素為 inf。有 clip 時範圍只取外框在 clip
+        裡的部分，完全落在外面的面不畫。
+        """
+        if not faces:
+            return np.full((0, 0), np.inf), pygame.Rect(0, 0, 0, 0)
+        corners = np.array([vertices for _, vertices in faces], dtype=float)
+        screen, _ = camera.project_many(corners.reshape(-1, 3))
+        screen = screen.reshape(-1, 4, 2)
+        low = screen.min(axis=1) - outline
+        high = screen.max(axis=1) + outline + 1
+        bounds = pygame.Rect(low.min(axis=0).tolist(), (high.max(axis=0) - low.min(axis=0)).tolist()).clip(self.ids.get_rect())
+        if clip is not None:
+            bounds = bounds.clip(clip)
+        if bounds.width == 0 or bounds.height == 0:
+            return np.full((0, 0), np.inf), bounds
+        inside = (low < bounds.bottomright).all(axis=1) & (high > bounds.topleft).all(axis=1)
+        self.ids.set_clip(bounds)
+        self.ids.fill(0, bounds)
+        index = np.flatnonzero(inside)
+        for i, points in zip((index + 1).tolist(), screen[index].tolist()):
+            pygame.draw.polygon(self.ids, i, points)
+            pygame.draw.polygon(self.ids, i, points, outline)
+        self.ids.set_clip(None)
+        ids = pygame.surfarray.array2d(self.ids.subsurface(bounds))
+        axes = np.array([FACE_AXES[name][0] for name, _ in faces])
+        planes = corners[np.arange(len(faces)), 0, axes]
+        depth = np.full(ids.shape, np.inf)
+        hit = np.nonzero(ids)
+        index = ids[hit] - 1
+        # 描邊超出面的像素，交點可能不可靠，get_depths 會把它們推到最遠
+        depth[hit] = get_depths(camera, axes[index], planes[index], hit[0] + bounds.x, hit[1] + bounds.y)
+        return depth, bounds
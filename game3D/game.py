@@ -6,9 +6,12 @@ from block import Block
 from menu import Menu
 from leaderboard import Leaderboard
 from camera import Camera
-from tetromino import Tetromino
+from tetromino import Tetromino, PALETTE
+from surface import SurfaceMesh
+from renderer import RENDERERS
+from text_cache import render_text
 from constants import WINDOW_HEIGHT, WINDOW_WIDTH, GRID_SIZE, GRID_WIDTH, GRID_HEIGHT, GRID_DEPTH
-from constants import BLACK, WHITE, LIGHT_GRAY, TRANSPARENT_BLUE, RED, GREEN, BLUE
+from constants import BLACK, WHITE
 import json
 from keymap_util import get_key_constant
 
@@ -37,13 +40,21 @@ class Game:
         self.camera = Camera(screen_width=width, screen_height=height)
         self.menu = Menu(self.screen)
         self.leaderboard = Leaderboard(self.screen)
-        self.grid = np.zeros((GRID_WIDTH, GRID_HEIGHT, GRID_DEPTH), dtype=int)
-        self.placed_blocks = []
+        # 每格存放置方塊的顏色編號（見 tetromino.PALETTE），0 為空格
+        self.grid = np.zeros((GRID_WIDTH, GRID_HEIGHT, GRID_DEPTH), dtype=np.uint8)
+        # 已放置方塊露出的面，放置和消行時增量更新
+        self.surface = SurfaceMesh(self.grid, PALETTE)
+        # 每個 (x, z) 柱子的高度，也就是最高方塊上面那格的 y，空柱子為 0
+        self.heights = np.zeros((GRID_WIDTH, GRID_DEPTH), dtype=int)
+        self.ghost_blocks = []
+        self.ghost_key = None
+        self.render_backend = None
+        self.set_render_backend(settings.get("render_backend", "painter"))
         self.current_tetromino = Tetromino()
         self.fall_time = 0
         self.fall_speed = 750
         self.score = 0
-        self.font = pygame.font.Font(None, 36)
+        self.font_size = 36
         self.keys_pressed = set()
         # Load and play background music
         pygame.mixer.music.load("game3D/background_music.mp3")  # Replace with your music file name
@@ -64,175 +75,102 @@ class Game:
         self.key_bindings = {}
         for action, key_name in settings.get('key_bindings', {}).items():
             self.key_bindings[action] = get_key_constant(key_name)
+        self.set_render_backend(settings.get("render_backend", "painter"))
+
+    def set_render_backend(self, name):
+        """切換繪圖方式，名稱見 renderer.RENDERERS，不認得的名稱就用畫家演算法"""
+        name = name if name in RENDERERS else "painter"
+        # 沒換繪圖方式時沿用原本的 renderer，保留它的畫面快取
+        if name != self.render_backend:
+            self.render_backend = name
+            self.renderer = RENDERERS[name]()
+
+    def fits(self, offsets, x, y, z):
+        """形狀 offsets（(N, 3) 整數陣列）放在 (x, y, z) 是否合法，一次檢查所有格子"""
+        cells = offsets + (x, y, z)
+        xs, ys, zs = cells[:, 0], cells[:, 1], cells[:, 2]
+        # 檢查邊界，頂端以上不算出界
+        if xs.min() < 0 or xs.max() >= GRID_WIDTH or ys.min() < 0 or zs.min() < 0 or zs.max() >= GRID_DEPTH:
+            return False
+        # 檢查是否與已放置的方塊重疊
+        inside = ys < GRID_HEIGHT
+        return not self.grid[xs[inside], ys[inside], zs[inside]].any()
 
     def is_valid_position(self, tetromino):
-        for offset in tetromino.shape:
-            pos = tetromino.position + offset
-            x, y, z = int(pos.x), int(pos.y), int(pos.z)
-            
-            # 檢查邊界
-            if x < 0 or x >= GRID_WIDTH or y < 0 or z < 0 or z >= GRID_DEPTH:
-                return False
-            
-            # 檢查是否與已放置的方塊重疊
-            if y < GRID_HEIGHT and self.grid[x, y, z] != 0:
-                return False
-        
-        return True
+        position = tetromino.position
+        return self.fits(tetromino.offsets, position.x, position.y, position.z)
+
+    def can_move(self, dx, dy, dz):
+        position = self.current_tetromino.position
+        return self.fits(self.current_tetromino.offsets, position.x + dx, position.y + dy, position.z + dz)
     
     def place_tetromino(self):
+        cells = []
         for offset in self.current_tetromino.shape:
             pos = self.current_tetromino.position + offset
             x, y, z = int(pos.x), int(pos.y), int(pos.z)
             if 0 <= x < GRID_WIDTH and 0 <= y < GRID_HEIGHT and 0 <= z < GRID_DEPTH:
-                self.grid[x, y, z] = 1
-                block = Block((x + 0.5) * GRID_SIZE, (y + 0.5) * GRID_SIZE, (z + 0.5) * GRID_SIZE, self.current_tetromino.color)
-                self.placed_blocks.append(block)
+                self.grid[x, y, z] = self.current_tetromino.color_id
+                cells.append((x, y, z))
+                self.heights[x, z] = max(self.heights[x, z], y + 1)
+        self.surface.add_cells(cells)
     
     def clear_lines(self):
-        lines_cleared = 0
-        for y in range(GRID_HEIGHT):
-            if np.all(self.grid[:, y, :] == 1):
-                # 清除這一層
-                self.grid[:, y, :] = 0
-                # 移除對應的方塊
-                self.placed_blocks = [block for block in self.placed_blocks 
-                                    if int(block.position.y / GRID_SIZE) != y]
-                
-                # 讓上面的方塊下降
-                for above_y in range(y + 1, GRID_HEIGHT):
-                    self.grid[:, above_y - 1, :] = self.grid[:, above_y, :]
-                    self.grid[:, above_y, :] = 0
-                
-                # 更新方塊位置
-                for block in self.placed_blocks:
-                    if block.position.y > y * GRID_SIZE:
-                        block.position.y -= GRID_SIZE
-                
-                lines_cleared += 1
-        
-        if lines_cleared > 0:
-            self.score += lines_cleared * 100
-    
-    def draw_game_area_boundary(self):
-        """繪製半透明的遊戲區域邊界"""
-        # 創建半透明表面
-        boundary_surface = pygame.Surface((WINDOW_WIDTH, WINDOW_HEIGHT), pygame.SRCALPHA)
-        
-        # 繪製底面邊界
-        bottom_vertices = [
-            self.camera.project(Vector3D(0, 0, 0))[0:2],
-            self.camera.project(Vector3D(GRID_WIDTH * GRID_SIZE, 0, 0))[0:2],
-            self.camera.project(Vector3D(GRID_WIDTH * GRID_SIZE, 0, GRID_DEPTH * GRID_SIZE))[0:2],
-            self.camera.project(Vector3D(0, 0, GRID_DEPTH * GRID_SIZE))[0:2]
-        ]
-        pygame.draw.polygon(boundary_surface, TRANSPARENT_BLUE, bottom_vertices)
-        
-        # 繪製邊框線
-        boundary_lines = [
-            # 底面邊框
-            (Vector3D(0, 0, 0), Vector3D(GRID_WIDTH * GRID_SIZE, 0, 0)),
-            (Vector3D(GRID_WIDTH * GRID_SIZE, 0, 0), Vector3D(GRID_WIDTH * GRID_SIZE, 0, GRID_DEPTH * GRID_SIZE)),
-            (Vector3D(GRID_WIDTH * GRID_SIZE, 0, GRID_DEPTH * GRID_SIZE), Vector3D(0, 0, GRID_DEPTH * GRID_SIZE)),
-            (Vector3D(0, 0, GRID_DEPTH * GRID_SIZE), Vector3D(0, 0, 0)),
-            # 垂直邊框
-            (Vector3D(0, 0, 0), Vector3D(0, GRID_HEIGHT * GRID_SIZE, 0)),
-            (Vector3D(GRID_WIDTH * GRID_SIZE, 0, 0), Vector3D(GRID_WIDTH * GRID_SIZE, GRID_HEIGHT * GRID_SIZE, 0)),
-            (Vector3D(GRID_WIDTH * GRID_SIZE, 0, GRID_DEPTH * GRID_SIZE), Vector3D(GRID_WIDTH * GRID_SIZE, GRID_HEIGHT * GRID_SIZE, GRID_DEPTH * GRID_SIZE)),
-            (Vector3D(0, 0, GRID_DEPTH * GRID_SIZE), Vector3D(0, GRID_HEIGHT * GRID_SIZE, GRID_DEPTH * GRID_SIZE)),
-        ]
-        
-        for start, end in boundary_lines:
-            start_2d = self.camera.project(start)[0:2]
-            end_2d = self.camera.project(end)[0:2]
-            pygame.draw.line(boundary_surface, LIGHT_GRAY, start_2d, end_2d, 2)
-        
-        self.screen.blit(boundary_surface, (0, 0))
-    
-    def draw_axes(self):
-        """Draw the X, Y, and Z axes for orientation."""
-        axis_length = GRID_SIZE * max(GRID_WIDTH, GRID_HEIGHT, GRID_DEPTH)
-
-        # Define the axes
-        axes = {
-            "X": (Vector3D(0, 0, 0), Vector3D(axis_length, 0, 0), RED),
-            "Y": (Vector3D(0, 0, 0), Vector3D(0, axis_length, 0), GREEN),
-            "Z": (Vector3D(0, 0, 0), Vector3D(0, 0, axis_length), BLUE),
-        }
-
-        for axis, (start, end, color) in axes.items():
-            # Project the start and end points of the axis
-            start_2d = self.camera.project(start)[0:2]
-            end_2d = self.camera.project(end)[0:2]
+        # 一次找出所有填滿的層，相鄰的好幾層也會一起消掉
+        full = (self.grid != 0).all(axis=(0, 2))
+        lines_cleared = int(full.sum())
+        if lines_cleared == 0:
+            return
+        # 留下沒滿的層往下壓緊，上面補空層
+        kept = GRID_HEIGHT - lines_cleared
+        self.grid[:, :kept, :] = self.grid[:, ~full, :]
+        self.grid[:, kept:, :] = 0
+        # 從 grid 重建最低消除層以上的表面
+        self.surface.rebuild(int(np.argmax(full)))
+        self.update_heights()
+        self.score += lines_cleared * 100
 
-            # Draw the axis line
-            pygame.draw.line(self.screen, color, start_2d, end_2d, 2)
+    def update_heights(self):
+        """由 grid 重算每個柱子的高度"""
+        filled = self.grid != 0
+        top = GRID_HEIGHT - np.argmax(filled[:, ::-1, :], axis=1)
+        self.heights = np.where(filled.any(axis=1), top, 0)
 
-            # Draw the axis label
-            label_position = self.camera.project(end)[0:2]
-            font = pygame.font.Font(None, 24)
-            label = font.render(axis, True, color)
-            self.screen.blit(label, (label_position[0] - 10, label_position[1] - 10))
+    def get_landing_y(self, tetromino):
+        """方塊直直落下後停住的 y，取方塊每格所在柱子高度的最大值"""
+        position = tetromino.position
+        landing = max(self.heights[int(position.x + offset.x), int(position.z + offset.z)] - int(offset.y)
+            for offset in tetromino.shape)
+        if landing > position.y:
+            # 方塊鑽到懸空的方塊底下了，只能從目前高度一格一格往下試
+            landing = position.y
+            while self.fits(tetromino.offsets, position.x, landing - 1, position.z):
+                landing -= 1
+        return landing
     
-    def get_ghost_tetromino(self, grid):
-        # 複製目前方塊
-        ghost = Tetromino()
-        ghost.shape = self.current_tetromino.shape[:]
-        ghost.position = Vector3D(
-            self.current_tetromino.position.x,
-            self.current_tetromino.position.y,
-            self.current_tetromino.position.z
-        )
-        ghost.color = (180, 180, 180)  # 用灰色顯示預置
-        # 一直往下移動直到不能再下
-        while True:
-            test = Tetromino()
-            test.shape = ghost.shape[:]
-            test.position = Vector3D(ghost.position.x, ghost.position.y - 1, ghost.position.z)
-            test.color = ghost.color
-            if self.is_valid_position(test):
-                ghost.position.y -= 1
-            else:
-                break
-        ghost.blocks = ghost.create_blocks()
-        return ghost
+    def get_ghost_blocks(self):
+        """目前方塊落地位置的方塊，只在方塊移動、旋轉或場地改變時重建"""
+        tetromino = self.current_tetromino
+        position = tetromino.position
+        landing = self.get_landing_y(tetromino)
+        key = (position.x, landing, position.z, tetromino.offsets.tobytes())
+        if key != self.ghost_key:
+            ghost = Vector3D(position.x, landing, position.z)
+            self.ghost_blocks = []
+            for offset in tetromino.shape:
+                pos = ghost + offset
+                self.ghost_blocks.append(Block((pos.x + 0.5) * GRID_SIZE, (pos.y + 0.5) * GRID_SIZE, (pos.z + 0.5) * GRID_SIZE, (180, 180, 180)))  # 用灰色顯示預置
+            self.ghost_key = key
+        return self.ghost_blocks
 
     def draw(self):
-        self.screen.fill(BLACK)
-        # Draw the game area boundary
-        self.draw_game_area_boundary()
-        # Draw the XYZ axes
-        self.draw_axes()
-        # Collect and sort all blocks by depth
-        all_blocks = []
-        # Add placed blocks
-        for block in self.placed_blocks:
-            depth = self.camera.project(block.position)[2]
-            all_blocks.append((block, depth))
-        # Add ghost tetromino blocks
-        ghost = self.get_ghost_tetromino(self.grid)
-        for block in ghost.blocks:
-            depth = self.camera.project(block.position)[2]
-            all_blocks.append((block, depth, True))  # True 代表 ghost
-        # Add current tetromino blocks
-        for block in self.current_tetromino.blocks:
-            depth = self.camera.project(block.position)[2]
-            all_blocks.append((block, depth, False))
-        # Sort blocks by depth (farther blocks first)
-        all_blocks.sort(key=lambda x: x[1], reverse=True)
-        # Draw all blocks
-        for item in all_blocks:
-            if len(item) == 3:
-                block, depth, is_ghost = item
-            else:
-                block, depth = item
-                is_ghost = False
-            if is_ghost:
-                self.draw_block_with_faces(block, ghost=True)
-            else:
-                self.draw_block_with_faces(block)
+        pieces = self.current_tetromino.blocks
+        # 和目前方塊重疊的 ghost 格子本來就會被蓋住，不用畫
+        piece_cells = {(block.position.x, block.position.y, block.position.z) for block in pieces}
+        ghost = [block for block in self.get_ghost_blocks() if (block.position.x, block.position.y, block.position.z) not in piece_cells]
+        self.renderer.draw(self.screen, self.camera, self.surface, pieces, ghost)
         # Draw UI
-        score_text = self.font.render(f"Score: {self.score}", True, WHITE)
+        score_text = render_text(f"Score: {self.score}", WHITE, self.font_size)
         self.screen.blit(score_text, (10, 10))
         controls_text = [
             "Controls:",
@@ -241,38 +179,14 @@ class Game:
             "E: Rotate Y-axis",
             "R: Rotate Z-axis",
             "Space: Fast Drop",
+            "F: Hard Drop",
             "Mouse: Drag to rotate camera"
         ]
         for i, text in enumerate(controls_text):
-            rendered = pygame.font.Font(None, 24).render(text, True, WHITE)
+            rendered = render_text(text, WHITE, 24)
             self.screen.blit(rendered, (10, 50 + i * 25))
         pygame.display.flip()
 
-    def draw_block_with_faces(self, block, ghost=False):
-        """繪製方塊的可見面"""
-        visible_faces = block.get_face_vertices(self.camera)
-        visible_faces.sort(key=lambda x: x[2], reverse=True)
-        for face_name, vertices, depth in visible_faces:
-            projected_vertices = [self.camera.project(v)[0:2] for v in vertices]
-            base_color = block.color
-            color = (200, 200, 200) if ghost else base_color
-            if face_name in ['back', 'bottom', 'left']:
-                shadow_factor = 0.7
-                color = (
-                    int(color[0] * shadow_factor),
-                    int(color[1] * shadow_factor),
-                    int(color[2] * shadow_factor)
-                )
-            if ghost:
-                # 半透明繪製 ghost
-                ghost_surface = pygame.Surface(self.screen.get_size(), pygame.SRCALPHA)
-                pygame.draw.polygon(ghost_surface, (color[0], color[1], color[2], 80), projected_vertices)
-                self.screen.blit(ghost_surface, (0, 0))
-                pygame.draw.polygon(self.screen, (180, 180, 180), projected_vertices, 1)
-            else:
-                pygame.draw.polygon(self.screen, color, projected_vertices)
-                pygame.draw.polygon(self.screen, BLACK, projected_vertices, 2)
-    
     def handle_input(self):
         keys = pygame.key.get_pressed()
         # 取得自訂鍵位
@@ -283,16 +197,13 @@ class Game:
         rotate_left = self.key_bindings.get('rotate_left', K_q)
         rotate_right = self.key_bindings.get('rotate_right', K_e)
         drop = self.key_bindings.get('drop', K_SPACE)
+        hard_drop = self.key_bindings.get('hard_drop', K_f)
         directions = [move_forward, move_left, move_backward, move_right]
         for key in directions:
             if keys[key] and key not in self.keys_pressed:
                 dir = self.get_movement_direction(key)
                 dx, dz = round(dir.x), round(dir.z)
-                test = Tetromino()
-                test.shape = self.current_tetromino.shape[:]
-                test.position = self.current_tetromino.position + Vector3D(dx, 0, dz)
-                test.color = self.current_tetromino.color
-                if self.is_valid_position(test):
+                if self.can_move(dx, 0, dz):
                     self.current_tetromino.move(dx, 0, dz)
 
         # 旋轉
@@ -334,55 +245,32 @@ class Game:
                         self.try_rotate('y', 1)
         # 快速下降
         if keys[drop]:
-            test = Tetromino()
-            test.shape = self.current_tetromino.shape[:]
-            test.position = self.current_tetromino.position + Vector3D(0, -1, 0)
-            test.color = self.current_tetromino.color
-            if self.is_valid_position(test):
+            if self.can_move(0, -1, 0):
                 self.current_tetromino.move(0, -1, 0)
                 self.score += 1
-        self.keys_pressed = {key for key in [move_left, move_right, move_forward, move_backward, rotate_left, rotate_right] if keys[key]}
+        # 直接落到底，下一次 update 就會固定
+        if keys[hard_drop] and hard_drop not in self.keys_pressed:
+            landing = self.get_landing_y(self.current_tetromino)
+            rows = int(self.current_tetromino.position.y - landing)
+            self.current_tetromino.move(0, -rows, 0)
+            self.score += rows
+            self.fall_time = self.fall_speed
+        self.keys_pressed = {key for key in [move_left, move_right, move_forward, move_backward, rotate_left, rotate_right, hard_drop] if keys[key]}
     
     def try_rotate(self, axis, direction):
-        old_shape = self.current_tetromino.shape[:]
-        # 修正旋轉方向，將 direction 取反
-        direction = -direction
-        if axis == 'x':
-            if direction == 1:
-                self.current_tetromino.rotate_x()
-            else:
-                for _ in range(3):
-                    self.current_tetromino.rotate_x()
-        elif axis == 'y':
-            if direction == 1:
-                self.current_tetromino.rotate_y()
-            else:
-                for _ in range(3):
-                    self.current_tetromino.rotate_y()
-        elif axis == 'z':
-            if direction == 1:
-                self.current_tetromino.rotate_z()
-            else:
-                for _ in range(3):
-                    self.current_tetromino.rotate_z()
-        if not self.is_valid_position(self.current_tetromino):
-            self.current_tetromino.shape = old_shape
-            self.current_tetromino.blocks = self.current_tetromino.create_blocks()
+        tetromino = self.current_tetromino
+        # 修正旋轉方向，將 direction 取反；旋轉只是查表
+        orientation = tetromino.get_rotated_orientation(axis, -direction)
+        position = tetromino.position
+        if self.fits(tetromino.get_offsets(orientation), position.x, position.y, position.z):
+            tetromino.set_orientation(orientation)
+            tetromino.blocks = tetromino.create_blocks()
     
     def update(self, dt):
         self.fall_time += dt
         if self.fall_time >= self.fall_speed:
             # 嘗試讓方塊下降一層
-            test_tetromino = Tetromino()
-            test_tetromino.shape = self.current_tetromino.shape[:]
-            test_tetromino.position = Vector3D(
-                self.current_tetromino.position.x,
-                self.current_tetromino.position.y - 1,
-                self.current_tetromino.position.z
-            )
-            test_tetromino.color = self.current_tetromino.color
-
-            if self.is_valid_position(test_tetromino):
+            if self.can_move(0, -1, 0):
                 self.current_tetromino.move(0, -1, 0)
             else:
                 # 只有在嘗試下移一層失敗時才固定方塊，允許玩家極限嵌入
@@ -417,15 +305,14 @@ class Game:
         
     def get_player_name(self):
         name = ""
-        font = pygame.font.Font(None, 36)
         input_active = True
 
         while input_active:
             self.screen.fill(BLACK)
-            prompt_text = font.render("Enter your name:", True, WHITE)
+            prompt_text = render_text("Enter your name:", WHITE, self.font_size)
             self.screen.blit(prompt_text, (WINDOW_WIDTH // 2 - prompt_text.get_width() // 2, WINDOW_HEIGHT // 2 - 50))
 
-            name_text = font.render(name, True, WHITE)
+            name_text = render_text(name, WHITE, self.font_size)
             self.screen.blit(name_text, (WINDOW_WIDTH // 2 - name_text.get_width() // 2, WINDOW_HEIGHT // 2))
 
             pygame.display.flip()
@@ -445,8 +332,9 @@ class Game:
         return name
     
     def reset_game(self):
-        self.grid = np.zeros((GRID_WIDTH, GRID_HEIGHT, GRID_DEPTH), dtype=int)
-        self.placed_blocks = []
+        self.grid = np.zeros((GRID_WIDTH, GRID_HEIGHT, GRID_DEPTH), dtype=np.uint8)
+        self.surface = SurfaceMesh(self.grid, PALETTE)
+        self.heights = np.zeros((GRID_WIDTH, GRID_DEPTH), dtype=int)
         self.current_tetromino = Tetromino()
         self.fall_time = 0
         self.score = 0
@@ -2,6 +2,7 @@ import pygame
 from pygame.locals import *
 import json
 import os
+from text_cache import render_text
 
 BLACK = (0, 0, 0)
 WHITE = (255, 255, 255)
@@ -12,7 +13,7 @@ LEADERBOARD_FILE = os.path.join(os.path.dirname(__file__), "leaderboard.json")
 class Leaderboard:
     def __init__(self, screen):
         self.screen = screen
-        self.font = pygame.font.Font(None, 36)
+        self.font_size = 36
 
     def load_scores(self):
         if not os.path.exists(LEADERBOARD_FILE):
@@ -29,15 +30,15 @@ class Leaderboard:
 
     def draw(self):
         self.screen.fill(BLACK)
-        title = self.font.render("Leaderboard", True, WHITE)
+        title = render_text("Leaderboard", WHITE, self.font_size)
         self.screen.blit(title, (400 - title.get_width() // 2, 50))
 
         scores = self.load_scores()
         for i, entry in enumerate(scores):
-            text = self.font.render(f"{i + 1}. {entry['name']} - {entry['score']}", True, WHITE)
+            text = render_text(f"{i + 1}. {entry['name']} - {entry['score']}", WHITE, self.font_size)
             self.screen.blit(text, (400 - text.get_width() // 2, 100 + i * 30))
 
-        back_text = self.font.render("Press B to go back", True, WHITE)
+        back_text = render_text("Press B to go back", WHITE, self.font_size)
         self.screen.blit(back_text, (400 - back_text.get_width() // 2, 550))
         pygame.display.flip()
 
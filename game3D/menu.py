@@ -1,5 +1,6 @@
 import pygame
 from pygame.locals import *
+from text_cache import render_text
 
 BLACK = (0, 0, 0)
 WHITE = (255, 255, 255)
@@ -8,18 +9,18 @@ GRAY = (128, 128, 128)
 class Menu:
     def __init__(self, screen):
         self.screen = screen
-        self.font = pygame.font.Font(None, 48)
+        self.font_size = 48
         self.options = ["Start Game", "Leaderboard", "Settings", "Quit"]
         self.selected_option = 0
 
     def draw(self):
         self.screen.fill(BLACK)
-        title = self.font.render("3D Tetris", True, WHITE)
+        title = render_text("3D Tetris", WHITE, self.font_size)
         self.screen.blit(title, (400 - title.get_width() // 2, 100))
 
         for i, option in enumerate(self.options):
             color = WHITE if i == self.selected_option else GRAY
-            text = self.font.render(option, True, color)
+            text = render_text(option, color, self.font_size)
             self.screen.blit(text, (400 - text.get_width() // 2, 200 + i * 50))
 
         pygame.display.flip()
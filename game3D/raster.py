@@ -0,0 +1,95 @@
+import numpy as np
+from surface import FACE_AXES
+from depth_buffer import get_depths
+
+# 外框大小相同的四邊形一起處理，外框寬高進位到 2 的次方，組數才不會太多
+MIN_TILE = 4
+
+def get_fragments(faces, camera, size, outline=1.0):
+    """faces [(面名稱, 世界座標頂點 (4, 3))] 蓋到的像素，一組一組用陣列運算算完
+
+    回傳 (x, y, 深度, 面的編號, 是否在描邊上)，都是一維陣列，離邊緣不到
+    outline 個像素的算在描邊上，size 是螢幕的 (寬, 高)。深度是視線和面所在
+    平面的交點（見 depth_buffer.get_depths）。
+    """
+    width, height = size
+    empty = np.empty(0, dtype=int)
+    if not faces:
+        return empty, empty, np.empty(0), empty, np.empty(0, dtype=bool)
+    corners = np.array([vertices for _, vertices in faces], dtype=float)
+    axes = np.array([FACE_AXES[name][0] for name, _ in faces])
+    planes = corners[np.arange(len(faces)), 0, axes]
+    screen, _ = camera.project_many(corners.reshape(-1, 3))
+    screen = screen.reshape(-1, 4, 2).astype(float)
+    edges = np.roll(screen, -1, axis=1) - screen
+    lengths = np.hypot(edges[..., 0], edges[..., 1])
+    # 有號面積決定繞行方向，邊函數乘上它之後內部一律為正
+    area = (screen[:, :, 0] * np.roll(screen[:, :, 1], -1, axis=1) - np.roll(screen[:, :, 0], -1, axis=1) * screen[:, :, 1]).sum(axis=1)
+    low = np.maximum(screen.min(axis=1), 0).astype(int)
+    high = np.minimum(screen.max(axis=1) + 1, (width, height)).astype(int)
+    size = high - low
+    keep = (size > 0).all(axis=1) & (np.abs(area) >= 1)
+    tiles = np.maximum(2 ** np.ceil(np.log2(np.maximum(size, 1))).astype(int), MIN_TILE)
+    fragments = []
+    for tile_width, tile_height in np.unique(tiles[keep], axis=0):
+        group = np.flatnonzero(keep & (tiles[:, 0] == tile_width) & (tiles[:, 1] == tile_height))
+        xs = low[group, 0, None, None] + np.arange(tile_width)[:, None]
+        ys = low[group, 1, None, None] + np.arange(tile_height)
+        # (組內數量, 4 條邊, 寬, 高) 的邊函數，以像素中心計算
+        start = screen[group, :, None, None, :]
+        edge = edges[group, :, None, None, :]
+        f = edge[..., 0] * (ys[:, None] + 0.5 - start[..., 1]) - edge[..., 1] * (xs[:, None] + 0.5 - start[..., 0])
+        f *= np.sign(area[group])[:, None, None, None]
+        inside = (f >= 0).all(axis=1) & (xs < high[group, 0, None, None]) & (ys < high[group, 1, None, None])
+        member, tx, ty = np.nonzero(inside)
+        face = group[member]
+        x = low[face, 0] + tx
+        y = low[face, 1] + ty
+        distance = (f[member, :, tx, ty] / np.maximum(lengths[face], 1e-9)).min(axis=1)
+        fragments.append((x, y, get_depths(camera, axes[face], planes[face], x, y), face, distance < outline))
+    if not fragments:
+        return empty, empty, np.empty(0), empty, np.empty(0, dtype=bool)
+    return tuple(np.concatenate(parts) for parts in zip(*fragments))
+
+def get_bounds(*fragment_sets):
+    """所有片段在螢幕上的外框 (x0, y0, x1, y1)，沒有片段時回傳 None"""
+    xs = [fragments[0] for fragments in fragment_sets if len(fragments[0])]
+    ys = [fragments[1] for fragments in fragment_sets if len(fragments[1])]
+    if not xs:
+        return None
+    return (min(x.min() for x in xs), min(y.min() for y in ys), max(x.max() for x in xs) + 1, max(y.max() for y in ys) + 1)
+
+def rasterize(color, depth, fragments, colors, origin=(0, 0), outline_color=(0, 0, 0)):
+    """把 get_fragments 的結果依深度畫進 color (寬, 高, 3) 和 depth (寬, 高)
+
+    兩個緩衝區的左上角在螢幕的 origin。比原本深度近的像素才寫入，colors
+    是每個面的顏色，描邊的像素用 outline_color。畫的順序不影響結果。
+    """
+    x, y, distance, face, edge = fragments
+    if len(x) == 0:
+        return
+    pixel = (x - origin[0]) * depth.shape[1] + (y - origin[1])
+    nearest = depth.reshape(-1)
+    np.minimum.at(nearest, pixel, distance)
+    won = distance <= nearest[pixel]
+    fragment_colors = np.array(colors, dtype=np.uint8)[face]
+    fragment_colors[edge] = outline_color
+    color.reshape(-1, 3)[pixel[won]] = fragment_colors[won]
+
+def blend(color, depth, fragments, colors, alpha, origin=(0, 0), outline_color=(0, 0, 0)):
+    """半透明的面：每個像素只取最近的面，比 depth 近才以 alpha 混進 color，不寫入 depth
+
+    描邊的像素不透明，直接用 outline_color。
+    """
+    x, y, distance, face, edge = fragments
+    if len(x) == 0:
+        return
+    pixel = (x - origin[0]) * depth.shape[1] + (y - origin[1])
+    nearest = np.full(depth.size, np.inf)
+    np.minimum.at(nearest, pixel, distance)
+    visible = (distance <= nearest[pixel]) & (distance < depth.reshape(-1)[pixel])
+    pixel, face, edge = pixel[visible], face[visible], edge[visible]
+    flat = color.reshape(-1, 3)
+    mixed = flat[pixel] * (1 - alpha) + np.array(colors, dtype=float)[face] * alpha
+    mixed[edge] = outline_color
+    flat[pixel] = mixed.astype(np.uint8)
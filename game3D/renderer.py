@@ -0,0 +1,351 @@
+import numpy as np
+import pygame
+from vector3d import Vector3D
+from surface import traversal_order
+from depth_buffer import DepthBuffer, DEPTH_BIAS, crop
+from raster import get_fragments, get_bounds, rasterize, blend
+from text_cache import render_text
+from constants import GRID_SIZE
+from constants import BLACK, LIGHT_GRAY, TRANSPARENT_BLUE, RED, GREEN, BLUE
+
+class SceneRenderer:
+    """用畫家演算法畫 3D 場地：邊界、座標軸、已放置方塊的表面網格和移動中的方塊
+
+    攝像機和場地連續兩幀沒變時，靜態的部分會畫進快取並記下每個像素的深度，
+    之後只重畫目前方塊和 ghost（見 depth_buffer.py）。
+    """
+
+    def __init__(self):
+        self.screen = None
+        self.camera = None
+        self.surface = None
+        # 半透明 ghost 用的圖層，見 draw_ghost
+        self.ghost_overlay = None
+        # 已放置方塊、邊界和座標軸畫好的畫面和每個像素的深度，攝像機或場地改變時重畫
+        self.static_scene = None
+        self.static_pixels = None
+        self.static_depth = None
+        self.static_view = None
+        self.last_view = None
+        self.depth_buffer = None
+        # 邊界和座標軸的背景，見 get_overlay
+        self.overlay = None
+        self.boundary_surface = None
+        self.overlay_key = None
+
+    def get_view(self):
+        """決定靜態畫面的所有東西，任何一個變了快取就要重畫"""
+        return (self.camera.version, self.surface, self.surface.version, self.screen.get_size())
+
+    def draw(self, screen, camera, surface, pieces, ghost):
+        """把場地畫到 screen 上，pieces 是目前方塊的格子，ghost 是落點預覽的格子"""
+        self.screen = screen
+        self.camera = camera
+        self.surface = surface
+        view = self.get_view()
+        # 攝像機和場地連續兩幀沒變就把靜態的部分畫進快取，之後只重畫移動中的方塊
+        if view != self.static_view and view == self.last_view:
+            self.render_static_scene()
+            self.static_view = view
+        if view == self.static_view:
+            self.screen.blit(self.static_scene, (0, 0))
+            self.draw_moving_blocks(pieces, ghost)
+        else:
+            # 攝像機正在轉動時快取每幀都會失效，直接照順序全部畫
+            self.draw_scene(pieces, ghost)
+        self.last_view = view
+
+    def get_overlay(self):
+        """邊界和座標軸畫在黑底上的背景，和螢幕一樣大
+
+        只在攝像機動過（Camera.update_position / set_screen_size 會讓 version
+        加一）、螢幕或場地大小改變時重畫，攝像機不動時每幀直接 blit。
+        """
+        size = self.screen.get_size()
+        key = (self.camera, self.camera.version, size, self.surface.shape)
+        if key != self.overlay_key:
+            if self.overlay is None or self.overlay.get_size() != size:
+                self.overlay = pygame.Surface(size)
+                self.boundary_surface = pygame.Surface(size, pygame.SRCALPHA)
+            self.overlay.fill(BLACK)
+            # Draw the game area boundary
+            self.draw_game_area_boundary(self.overlay)
+            # Draw the XYZ axes
+            self.draw_axes(self.overlay)
+            self.overlay_key = key
+        return self.overlay
+
+    def draw_game_area_boundary(self, target):
+        """在 target 上繪製半透明的遊戲區域邊界"""
+        width, height, depth = (n * GRID_SIZE for n in self.surface.shape)
+        # 半透明表面和 target 一樣大，重複使用，每次先清空
+        boundary_surface = self.boundary_surface
+        boundary_surface.fill((0, 0, 0, 0))
+        
+        # 繪製底面邊界
+        bottom_vertices = [
+            self.camera.project(Vector3D(0, 0, 0))[0:2],
+            self.camera.project(Vector3D(width, 0, 0))[0:2],
+            self.camera.project(Vector3D(width, 0, depth))[0:2],
+            self.camera.project(Vector3D(0, 0, depth))[0:2]
+        ]
+        pygame.draw.polygon(boundary_surface, TRANSPARENT_BLUE, bottom_vertices)
+        
+        # 繪製邊框線
+        boundary_lines = [
+            # 底面邊框
+            (Vector3D(0, 0, 0), Vector3D(width, 0, 0)),
+            (Vector3D(width, 0, 0), Vector3D(width, 0, depth)),
+            (Vector3D(width, 0, depth), Vector3D(0, 0, depth)),
+            (Vector3D(0, 0, depth), Vector3D(0, 0, 0)),
+            # 垂直邊框
+            (Vector3D(0, 0, 0), Vector3D(0, height, 0)),
+            (Vector3D(width, 0, 0), Vector3D(width, height, 0)),
+            (Vector3D(width, 0, depth), Vector3D(width, height, depth)),
+            (Vector3D(0, 0, depth), Vector3D(0, height, depth)),
+        ]
+        
+        for start, end in boundary_lines:
+            start_2d = self.camera.project(start)[0:2]
+            end_2d = self.camera.project(end)[0:2]
+            pygame.draw.line(boundary_surface, LIGHT_GRAY, start_2d, end_2d, 2)
+        
+        target.blit(boundary_surface, (0, 0))
+    
+    def draw_axes(self, target):
+        """Draw the X, Y, and Z axes for orientation onto target."""
+        axis_length = GRID_SIZE * max(self.surface.shape)
+
+        # Define the axes
+        axes = {
+            "X": (Vector3D(0, 0, 0), Vector3D(axis_length, 0, 0), RED),
+            "Y": (Vector3D(0, 0, 0), Vector3D(0, axis_length, 0), GREEN),
+            "Z": (Vector3D(0, 0, 0), Vector3D(0, 0, axis_length), BLUE),
+        }
+
+        for axis, (start, end, color) in axes.items():
+            # Project the start and end points of the axis
+            start_2d = self.camera.project(start)[0:2]
+            end_2d = self.camera.project(end)[0:2]
+
+            # Draw the axis line
+            pygame.draw.line(target, color, start_2d, end_2d, 2)
+
+            # Draw the axis label
+            label_position = self.camera.project(end)[0:2]
+            label = render_text(axis, color, 24)
+            target.blit(label, (label_position[0] - 10, label_position[1] - 10))
+    
+    def draw_scene(self, pieces, ghost):
+        """畫邊界、座標軸和所有方塊，已放置的方塊畫合併後的表面網格，移動中的方塊逐格畫"""
+        self.screen.blit(self.get_overlay(), (0, 0))
+        layers = {}
+        for block in pieces:
+            layers.setdefault(int(block.position.y // GRID_SIZE), []).append(block)
+        # 一層一層由遠到近畫，層內也照攝像機所在格子決定的順序走（見 surface.py）
+        camera_cell = self.surface.get_camera_cell(self.camera.position)
+        layer_count = max([self.surface.shape[1]] + [y + 1 for y in layers])
+        for y in traversal_order(layer_count, int(self.camera.position.y // GRID_SIZE)):
+            self.draw_layer(y, camera_cell, layers.get(y, []))
+        if ghost:
+            # ghost 可能跨好幾層，最後一次疊上去，被已放置方塊或目前方塊擋住的像素不畫
+            faces = [face for block in ghost for face in block.get_face_corners(self.camera.position)]
+            depth, bounds = self.get_depth_buffer().render(faces, self.camera, 1)
+            nearest, scene_bounds = self.depth_buffer.render(self.get_static_faces(), self.camera, clip=bounds)
+            nearest = crop(nearest, scene_bounds, bounds)
+            if pieces:
+                faces = [face for block in pieces for face in block.get_face_corners(self.camera.position)]
+                piece_depth, piece_bounds = self.depth_buffer.render(faces, self.camera)
+                nearest = np.minimum(nearest, crop(piece_depth, piece_bounds, bounds))
+            self.draw_ghost(ghost, (nearest < depth, bounds))
+
+    def get_depth_buffer(self):
+        if self.depth_buffer is None or self.depth_buffer.size != self.screen.get_size():
+            self.depth_buffer = DepthBuffer(self.screen.get_size())
+        return self.depth_buffer
+
+    def get_static_faces(self):
+        """已放置方塊看得到的面，和 draw_scene 相同的順序，給 DepthBuffer.render 用"""
+        camera_cell = self.surface.get_camera_cell(self.camera.position)
+        faces = []
+        for y in traversal_order(self.surface.shape[1], int(self.camera.position.y // GRID_SIZE)):
+            faces += [(name, corners) for name, corners, _ in self.surface.get_visible_quads(y, camera_cell)[0]]
+        return faces
+
+    def render_static_scene(self):
+        """不含移動中方塊的畫面存進 static_scene，每個像素的深度存進 static_depth"""
+        self.draw_scene([], [])
+        self.static_scene = self.screen.copy()
+        self.static_pixels = pygame.surfarray.array3d(self.static_scene)
+        # 和 draw_scene 相同的順序，看得到的面才會留在深度圖上
+        depth, bounds = self.get_depth_buffer().render(self.get_static_faces(), self.camera)
+        self.static_depth = crop(depth, bounds, self.screen.get_rect())
+
+    def draw_moving_blocks(self, pieces, ghost):
+        """把目前方塊和 ghost 疊到快取的畫面上，被已放置方塊擋住的像素不畫"""
+        screen_rect = self.screen.get_rect()
+        scene_depth, scene_bounds = self.static_depth, screen_rect
+        if pieces:
+            # 同一個方塊的格子之間也要由遠到近畫
+            camera_cell = self.surface.get_camera_cell(self.camera.position)
+            ranks = self.surface.get_cell_ranks(camera_cell[0], camera_cell[2])
+            layer_count = max(self.surface.shape[1], max(int(block.position.y // GRID_SIZE) for block in pieces) + 1)
+            layer_order = {y: i for i, y in enumerate(traversal_order(layer_count, int(self.camera.position.y // GRID_SIZE)))}
+            pieces = sorted(pieces, key=lambda block: (layer_order[int(block.position.y // GRID_SIZE)],
+                ranks[int(block.position.x // GRID_SIZE), int(block.position.z // GRID_SIZE)]))
+            for block in pieces:
+                self.draw_block_with_faces(block)
+            faces = [face for block in pieces for face in block.get_face_corners(self.camera.position)]
+            depth, bounds = self.depth_buffer.render(faces, self.camera)
+            static_depth = crop(self.static_depth, screen_rect, bounds)
+            hidden = static_depth + DEPTH_BIAS < depth
+            if hidden.any():
+                # 被擋住的像素從快取的畫面還原
+                screen = pygame.surfarray.pixels3d(self.screen)
+                screen[bounds.x:bounds.right, bounds.y:bounds.bottom][hidden] = \
+                    self.static_pixels[bounds.x:bounds.right, bounds.y:bounds.bottom][hidden]
+                del screen
+            scene_depth, scene_bounds = np.where(hidden, static_depth, np.minimum(static_depth, depth)), bounds
+        if ghost:
+            faces = [face for block in ghost for face in block.get_face_corners(self.camera.position)]
+            depth, bounds = self.depth_buffer.render(faces, self.camera, 1)
+            # ghost 在方塊範圍外的像素只和已放置的方塊比
+            nearest = crop(self.static_depth, screen_rect, bounds)
+            if scene_bounds != screen_rect:
+                nearest = np.minimum(nearest, crop(scene_depth, scene_bounds, bounds))
+            self.draw_ghost(ghost, (nearest < depth, bounds))
+
+    def draw_layer(self, y, camera_cell, pieces):
+        """畫第 y 層：側面和這層的方塊照走訪順序一起畫，頂面/底面最後畫
+
+        同一層裡，攝像機看得到的頂面（或底面）只可能蓋住側面，不會被側面蓋住。
+        方塊照所在格子的名次插進排好的側面之間。
+        """
+        quads, keys, corners = self.surface.get_visible_quads(y, camera_cell) if y < self.surface.shape[1] else ([], [], None)
+        if quads:
+            screen, _ = self.camera.project_many(corners.reshape(-1, 3))
+            screen = screen.reshape(-1, 4, 2).tolist()
+        ranks = self.surface.get_cell_ranks(camera_cell[0], camera_cell[2])
+        extras = [(2 * ranks[int(block.position.x // GRID_SIZE), int(block.position.z // GRID_SIZE)], i) for i, block in enumerate(pieces)]
+        # 最多只有幾個方塊，排序它們不影響效能
+        extras.sort()
+        extras.append((float('inf'), None))
+        j = 0
+        for i, (face_name, _, color) in enumerate(quads):
+            # 順序鍵比這個側面小的方塊先畫，側面畫完後剩下的方塊在頂面之前畫
+            key = keys[i] if i < len(keys) else float('inf')
+            while extras[j][0] < key:
+                self.draw_block_with_faces(pieces[extras[j][1]])
+                j += 1
+            self.draw_face(face_name, screen[i], color)
+        for _, index in extras[j:-1]:
+            self.draw_block_with_faces(pieces[index])
+
+    def draw_block_with_faces(self, block):
+        """繪製方塊的可見面"""
+        for face_name, projected_vertices, depth in block.get_face_vertices(self.camera):
+            self.draw_face(face_name, projected_vertices, block.color)
+
+    def draw_face(self, face_name, projected_vertices, color):
+        color = self.shade(face_name, color)
+        pygame.draw.polygon(self.screen, color, projected_vertices)
+        pygame.draw.polygon(self.screen, BLACK, projected_vertices, 2)
+
+    def shade(self, face_name, color):
+        if face_name in ['back', 'bottom', 'left']:
+            shadow_factor = 0.7
+            color = (
+                int(color[0] * shadow_factor),
+                int(color[1] * shadow_factor),
+                int(color[2] * shadow_factor)
+            )
+        return color
+
+    def draw_ghost(self, blocks, hidden=None):
+        """把 ghost 的所有面畫進一張半透明圖層，再一次疊到畫面上
+
+        圖層只有 ghost 在螢幕上的外框那麼大，而且會重複使用，只在
+        放不下時才重新配置。hidden 是 (遮罩, 範圍)，遮罩為真的像素被
+        擋住，不疊上去。
+        """
+        faces = []
+        for block in blocks:
+            faces += block.get_face_vertices(self.camera)
+        if not faces:
+            return
+        faces.sort(key=lambda x: x[2], reverse=True)
+        xs = [x for _, vertices, _ in faces for x, _ in vertices]
+        ys = [y for _, vertices, _ in faces for _, y in vertices]
+        bounds = pygame.Rect(min(xs), min(ys), max(xs) - min(xs) + 1, max(ys) - min(ys) + 1).clip(self.screen.get_rect())
+        if bounds.width == 0 or bounds.height == 0:
+            return
+        if self.ghost_overlay is None or self.ghost_overlay.get_width() < bounds.width or self.ghost_overlay.get_height() < bounds.height:
+            self.ghost_overlay = pygame.Surface(bounds.size, pygame.SRCALPHA)
+        area = pygame.Rect((0, 0), bounds.size)
+        self.ghost_overlay.fill((0, 0, 0, 0), area)
+        for face_name, vertices, depth in faces:
+            vertices = [(x - bounds.x, y - bounds.y) for x, y in vertices]
+            color = self.shade(face_name, (200, 200, 200))
+            pygame.draw.polygon(self.ghost_overlay, (color[0], color[1], color[2], 80), vertices)
+            pygame.draw.polygon(self.ghost_overlay, (180, 180, 180), vertices, 1)
+        if hidden is not None:
+            mask, mask_bounds = hidden
+            alpha = pygame.surfarray.pixels_alpha(self.ghost_overlay)
+            alpha[:bounds.width, :bounds.height][crop(mask, mask_bounds, bounds, False)] = 0
+            del alpha
+        self.screen.blit(self.ghost_overlay, bounds.topleft, area)
+
+class ZBufferRenderer(SceneRenderer):
+    """用 NumPy 軟體 z-buffer 畫方塊，不需要決定繪製順序
+
+    所有面一次用陣列運算光柵化成顏色和深度（見 raster.py），再用 surfarray
+    貼到畫面上，互相穿插的方塊也能正確遮擋。已放置方塊的結果依攝像機和
+    場地快取，每幀只光柵化目前方塊和 ghost。
+    """
+
+    def __init__(self):
+        super().__init__()
+        self.static_color = None
+
+    def draw(self, screen, camera, surface, pieces, ghost):
+        self.screen = screen
+        self.camera = camera
+        self.surface = surface
+        view = self.get_view()
+        if view != self.static_view:
+            self.render_static_scene()
+            self.static_view = view
+        self.screen.blit(self.static_scene, (0, 0))
+        pieces = [(name, corners, self.shade(name, block.color)) for block in pieces
+            for name, corners in block.get_face_corners(camera.position)]
+        ghost = [(name, corners, self.shade(name, (200, 200, 200))) for block in ghost
+            for name, corners in block.get_face_corners(camera.position)]
+        piece_fragments = get_fragments([face[:2] for face in pieces], camera, screen.get_size())
+        ghost_fragments = get_fragments([face[:2] for face in ghost], camera, screen.get_size())
+        bounds = get_bounds(piece_fragments, ghost_fragments)
+        if bounds is None:
+            return
+        # 只在目前方塊和 ghost 的外框裡重算，再貼回畫面
+        x0, y0, x1, y1 = bounds
+        color = self.static_color[x0:x1, y0:y1].copy()
+        depth = self.static_depth[x0:x1, y0:y1].copy()
+        rasterize(color, depth, piece_fragments, [face[2] for face in pieces], (x0, y0))
+        blend(color, depth, ghost_fragments, [face[2] for face in ghost], 80 / 255, (x0, y0), (180, 180, 180))
+        pygame.surfarray.blit_array(screen.subsurface((x0, y0, x1 - x0, y1 - y0)), color)
+
+    def render_static_scene(self):
+        """邊界和座標軸照舊用 pygame 畫，當作背景；已放置方塊光柵化在上面"""
+        self.screen.blit(self.get_overlay(), (0, 0))
+        self.static_color = np.ascontiguousarray(pygame.surfarray.array3d(self.screen))
+        self.static_depth = np.full(self.screen.get_size(), np.inf)
+        camera_cell = self.surface.get_camera_cell(self.camera.position)
+        quads = [quad for y in range(self.surface.shape[1]) for quad in self.surface.get_visible_quads(y, camera_cell)[0]]
+        fragments = get_fragments([(name, corners) for name, corners, _ in quads], self.camera, self.screen.get_size())
+        rasterize(self.static_color, self.static_depth, fragments, [self.shade(name, color) for name, _, color in quads])
+        self.static_scene = pygame.surfarray.make_surface(self.static_color)
+
+# settings.json 的 render_backend 可以選的繪圖方式
+RENDERERS = {
+    "painter": SceneRenderer,
+    "zbuffer": ZBufferRenderer,
+}
@@ -2,6 +2,7 @@ import pygame
 from pygame.locals import *
 import json
 import os
+from text_cache import render_text
 
 BLACK = (0, 0, 0)
 WHITE = (255, 255, 255)
@@ -16,6 +17,7 @@ DEFAULT_SETTINGS = {
     "mouse_sensitivity_x": 1.0,
     "mouse_sensitivity_y": 1.0,
     "volume": 0.5,
+    "render_backend": "painter",
     "key_bindings": {
         "move_left": "a",
         "move_right": "d",
@@ -23,7 +25,8 @@ DEFAULT_SETTINGS = {
         "move_backward": "w",
         "rotate_left": "q",
         "rotate_right": "e",
-        "drop": "space"
+        "drop": "space",
+        "hard_drop": "f"
     }
 }
 
@@ -51,7 +54,7 @@ class SettingsMenu:
     def __init__(self, screen, settings: Settings):
         self.screen = screen
         self.settings = settings
-        self.font = pygame.font.Font(None, 40)
+        self.font_size = 40
         self.options = [
             "Screen width", "Screen height", "Horizontal Sensetivity", "Vertical Sensetivity", "Volume", "Customize Keyboard", "Save and Return"
         ]
@@ -67,6 +70,7 @@ class SettingsMenu:
             ("rotate_left", "Rotate Left"),
             ("rotate_right", "Rotate Right"),
             ("drop", "Fast Drop"),
+            ("hard_drop", "Hard Drop"),
             ("Back to Settings", "Back to Settings")
         ]
         self.key_binding_index = 0
@@ -78,11 +82,11 @@ class SettingsMenu:
         if self.in_key_binding_menu:
             self.draw_key_binding_menu()
             return
-        title = self.font.render("Settings", True, WHITE)
+        title = render_text("Settings", WHITE, self.font_size)
         self.screen.blit(title, (400 - title.get_width() // 2, 60))
         for i, option in enumerate(self.options):
             color = WHITE if i == self.selected else GRAY
-            text = self.font.render(option, True, color)
+            text = render_text(option, color, self.font_size)
             y = 150 + i * 50
             self.screen.blit(text, (100, y))
             # 顯示目前設定值
@@ -114,23 +118,23 @@ class SettingsMenu:
                 show_val = val
                 val_color = LIGHT_GRAY
             if show_val:
-                val_text = self.font.render(show_val, True, val_color)
+                val_text = render_text(show_val, val_color, self.font_size)
                 self.screen.blit(val_text, (500, y))
         pygame.display.flip()
 
     def draw_key_binding_menu(self):
         self.screen.fill(BLACK)  # 清除畫面，避免標題重疊
-        title = self.font.render("Customize Keyboard", True, WHITE)
+        title = render_text("Customize Keyboard", WHITE, self.font_size)
         self.screen.blit(title, (400 - title.get_width() // 2, 60))
         for i, (key, label) in enumerate(self.key_binding_keys):
             color = WHITE if i == self.key_binding_index else GRAY
-            text = self.font.render(label, True, color)
+            text = render_text(label, color, self.font_size)
             y = 150 + i * 50
             self.screen.blit(text, (100, y))
             if key != "Back to Settings":
                 val = self.settings.settings["key_bindings"].get(key, "")
                 val_color = LIGHT_GRAY
-                val_text = self.font.render(val, True, val_color)
+                val_text = render_text(val, val_color, self.font_size)
                 self.screen.blit(val_text, (500, y))
         pygame.display.flip()
 
@@ -240,13 +244,13 @@ class SettingsMenu:
             f"Rotate (Q/E): {self.settings.settings['key_bindings'].get('rotate_y', 'q')}/{self.settings.settings['key_bindings'].get('rotate_x', 'e')}",
             f"Rotate Z: {self.settings.settings['key_bindings'].get('rotate_z', 'r')}",
             f"Fast Drop: {self.settings.settings['key_bindings'].get('drop', 'space')}",
+            f"Hard Drop: {self.settings.settings['key_bindings'].get('hard_drop', 'f')}",
             "Press any key to continue..."
         ]
         popup = pygame.Surface((600, 350))
         popup.fill((30, 30, 30))
-        font = pygame.font.Font(None, 36)
         for i, line in enumerate(info):
-            text = font.render(line, True, (255, 255, 0) if i == 0 else (255, 255, 255))
+            text = render_text(line, (255, 255, 0) if i == 0 else (255, 255, 255), 36)
             popup.blit(text, (30, 30 + i * 40))
         self.screen.blit(popup, (self.screen.get_width()//2 - 300, self.screen.get_height()//2 - 175))
         pygame.display.flip()
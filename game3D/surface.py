@@ -0,0 +1,186 @@
+import numpy as np
+from block import CUBE_FACES, FACE_BITS
+from constants import GRID_SIZE
+
+# 每個面的法向量在哪一軸、朝正或負方向
+FACE_AXES = {name: (next(axis for axis in range(3) if normal[axis]), sum(normal)) for name, (_, normal) in CUBE_FACES.items()}
+
+def greedy_rectangles(exposed, colors, grow_x, grow_z):
+    """把 (x, z) 平面上同色的露出面合併成矩形，回傳 [(x0, x1, z0, z1)]
+
+    grow_x / grow_z 決定能不能往該方向延伸：水平面兩個方向都可以，
+    側面只能沿著自己所在的平面延伸。
+    """
+    width, depth = exposed.shape
+    used = ~exposed
+    rectangles = []
+    for x0 in range(width):
+        for z0 in range(depth):
+            if used[x0, z0]:
+                continue
+            color = colors[x0, z0]
+            z1 = z0 + 1
+            if grow_z:
+                while z1 < depth and not used[x0, z1] and colors[x0, z1] == color:
+                    z1 += 1
+            x1 = x0 + 1
+            if grow_x:
+                while x1 < width and not used[x1, z0:z1].any() and (colors[x1, z0:z1] == color).all():
+                    x1 += 1
+            used[x0:x1, z0:z1] = True
+            rectangles.append((x0, x1, z0, z1))
+    return rectangles
+
+def traversal_order(count, camera_index):
+    """0 到 count - 1 由遠到近的順序：攝像機兩側各自由外往內走，攝像機所在的那一格最後
+
+    兩側的格子不會互相遮擋，所以只要各自由遠到近，怎麼交錯都可以，
+    順序只取決於攝像機在哪一格。
+    """
+    near = min(max(camera_index, -1), count)
+    order = list(range(0, min(near, count))) + list(range(count - 1, near, -1))
+    if 0 <= near < count:
+        order.append(near)
+    return order
+
+def box_face(name, low, high):
+    """長方體 low-high 在 name 方向那一面的 4 個頂點，繞行順序同 CUBE_FACES"""
+    return [(high[0] if i & 1 else low[0], high[1] if i >> 1 & 1 else low[1], high[2] if i >> 2 & 1 else low[2])
+        for i in CUBE_FACES[name][0]]
+
+class SurfaceMesh:
+    """grid 中已放置方塊的表面：記錄每格有哪些面貼著空格或場地外。
+
+    grid 存的是顏色編號（0 為空格），palette 把編號對應到顏色。
+    masks[x, y, z] 是該格露出面的位元遮罩（見 block.FACE_BITS），埋在相鄰
+    方塊之間的面不會出現。露出的面再逐層合併成大塊的四邊形：同色相鄰的頂面
+    和底面在 xz 平面上合併，所以一整層平的地板只要一個多邊形；前後兩面只沿
+    x 方向合併，左右兩面不合併，這樣每個側面都只屬於一列，可以照走訪順序畫
+    （見 get_visible_quads）。放置方塊時只重算附近的格子和那幾層的網格，
+    消行時只從 grid 重建被移動的那幾層，不需要每幀重建。
+    """
+
+    def __init__(self, grid, palette):
+        self.grid = grid
+        self.palette = palette
+        self.shape = width, height, depth = grid.shape
+        # 四周多留一圈空格，邊界上的面就會被視為露出
+        self.padded = np.zeros((width + 2, height + 2, depth + 2), dtype=bool)
+        self.filled = self.padded[1:-1, 1:-1, 1:-1]
+        self.masks = np.zeros(self.shape, dtype=np.uint8)
+        self.layers = [{} for y in range(height)]
+        # 每層依攝像機所在格子快取的繪製順序，該層網格改變時清掉
+        self.orders = [{} for y in range(height)]
+        self.ranks = {}
+        # 每次網格改變都會加一，讓畫面快取知道要重畫
+        self.version = 0
+        self.rebuild()
+
+    def update(self, low, high):
+        """重算 low 到 high（不含）這個範圍內每格的露出面，並重建這幾層的網格"""
+        (x0, y0, z0), (x1, y1, z1) = low, high
+        filled = self.filled[x0:x1, y0:y1, z0:z1]
+        masks = np.zeros(filled.shape, dtype=np.uint8)
+        for bit, (_, (dx, dy, dz)) in enumerate(CUBE_FACES.values()):
+            neighbor = self.padded[1 + x0 + dx:1 + x1 + dx, 1 + y0 + dy:1 + y1 + dy, 1 + z0 + dz:1 + z1 + dz]
+            masks |= (filled & ~neighbor).astype(np.uint8) << bit
+        self.masks[x0:x1, y0:y1, z0:z1] = masks
+        for y in range(y0, y1):
+            self.layers[y] = self.mesh_layer(y)
+            self.orders[y].clear()
+        self.version += 1
+
+    def add_cells(self, cells):
+        """cells 剛在 grid 中填上，更新它們和鄰格的露出面"""
+        if not cells:
+            return
+        for x, y, z in cells:
+            self.filled[x, y, z] = True
+        cells = np.array(cells)
+        low = np.maximum(cells.min(axis=0) - 1, 0)
+        high = np.minimum(cells.max(axis=0) + 2, self.shape)
+        self.update(low, high)
+
+    def rebuild(self, start_layer=0):
+        """grid 從 start_layer 以上都變了（例如消行後），從 grid 重建這幾層"""
+        self.filled[:, start_layer:, :] = self.grid[:, start_layer:, :] != 0
+        self.update((0, max(start_layer - 1, 0), 0), self.shape)
+
+    def mesh_layer(self, y):
+        """第 y 層每個方向合併後的四邊形
+
+        {面名稱: (頂點 (n, 4, 3), 所在平面的格線 (n,), 顏色編號 (n,), 所屬格子的 (x, z) (n, 2))}
+        """
+        layer = {}
+        colors = self.grid[:, y, :]
+        for name, (_, normal) in CUBE_FACES.items():
+            exposed = (self.masks[:, y, :] & FACE_BITS[name]) != 0
+            if not exposed.any():
+                continue
+            corners = []
+            face_colors = []
+            cells = []
+            for x0, x1, z0, z1 in greedy_rectangles(exposed, colors, normal[0] == 0, normal[1] != 0):
+                corners.append(box_face(name, (x0 * GRID_SIZE, y * GRID_SIZE, z0 * GRID_SIZE),
+                    (x1 * GRID_SIZE, (y + 1) * GRID_SIZE, z1 * GRID_SIZE)))
+                face_colors.append(colors[x0, z0])
+                cells.append((x0, z0))
+            corners = np.array(corners, dtype=float)
+            planes = (corners[:, 0, FACE_AXES[name][0]] // GRID_SIZE).astype(int)
+            layer[name] = (corners, planes, np.array(face_colors), np.array(cells))
+        return layer
+
+    def get_camera_cell(self, position):
+        """攝像機所在的格子，場地外的座標夾到場地外的第一格，再遠繪製順序也不會變"""
+        return tuple(min(max(int(c // GRID_SIZE), -1), n) for c, n in zip((position.x, position.y, position.z), self.shape))
+
+    def get_cell_ranks(self, camera_x, camera_z):
+        """攝像機在 (camera_x, camera_z) 這一欄時，一層裡每格 (x, z) 的走訪名次
+
+        一列一列由遠到近走，每列裡再由遠到近走（見 traversal_order）。
+        後走的格子不會被先走的擋住，所以照名次畫就不用再排序。
+        """
+        key = (camera_x, camera_z)
+        if key not in self.ranks:
+            width, _, depth = self.shape
+            ranks = np.empty((width, depth), dtype=int)
+            columns = traversal_order(width, camera_x)
+            for row, z in enumerate(traversal_order(depth, camera_z)):
+                ranks[columns, z] = np.arange(row * width, (row + 1) * width)
+            self.ranks[key] = ranks
+        return self.ranks[key]
+
+    def get_visible_quads(self, y, camera_cell):
+        """第 y 層面向攝像機的四邊形，回傳 (四邊形, 側面的順序鍵, 所有頂點 (n, 4, 3))
+
+        四邊形是 [(面名稱, 頂點, 顏色)]，前面是照走訪順序排好的側面，後面是
+        頂面或底面。格子 (x, z) 的順序鍵是名次的兩倍（見 get_cell_ranks），
+        左右兩面跟著所屬的格子；前後兩面在所屬那列的最外側，所以排在整列
+        之後，鍵是奇數。結果依攝像機所在格子快取，直到這層的網格改變。
+        """
+        orders = self.orders[y]
+        if camera_cell not in orders:
+            ranks = self.get_cell_ranks(camera_cell[0], camera_cell[2])
+            width = self.shape[0]
+            sides = []
+            flats = []
+            for name, (corners, planes, colors, cells) in self.layers[y].items():
+                axis, sign = FACE_AXES[name]
+                # 攝像機在平面外側才看得到這一面
+                visible = camera_cell[axis] >= planes if sign > 0 else camera_cell[axis] < planes
+                for i in np.flatnonzero(visible):
+                    quad = (name, corners[i], self.palette[colors[i]])
+                    if axis == 1:
+                        flats.append(quad)
+                        continue
+                    rank = ranks[cells[i][0], cells[i][1]]
+                    key = 2 * rank if axis == 0 else 2 * (rank // width * width + width - 1) + 1
+                    sides.append((key, quad))
+            sides.sort(key=lambda side: side[0])
+            quads = [quad for _, quad in sides] + flats
+            corners = np.array([vertices for _, vertices, _ in quads]).reshape(-1, 4, 3)
+            orders[camera_cell] = (quads, [key for key, _ in sides], corners)
+        return orders[camera_cell]
+
+    def count_quads(self):
+        return sum(len(quads[2]) for layer in self.layers for quads in layer.values())
@@ -1,5 +1,5 @@
 import random
-import math
+import numpy as np
 from vector3d import Vector3D
 from block import Block
 from constants import GRID_SIZE, GRID_WIDTH, GRID_HEIGHT, GRID_DEPTH
@@ -34,16 +34,26 @@ class Tetromino:
         6: WHITE,   # 3D special shape
     }
     
-    def __init__(self):
-        shape_index = random.randint(0, len(self.SHAPES) - 1)
-        self.shape = self.SHAPES[shape_index]
+    def __init__(self, shape_index=None):
+        if shape_index is None:
+            shape_index = random.randint(0, len(self.SHAPES) - 1)
+        self.shape_index = shape_index
+        self.set_orientation(0)
         self.position = Vector3D(
             (GRID_WIDTH - 1) // 2,  # 對齊格線中心（支援奇數寬度）
             GRID_HEIGHT - 1,
             (GRID_DEPTH - 1) // 2
         )
         self.color = self.SHAPE_COLORS[shape_index]
+        # 放進 grid 時存的顏色編號，見 PALETTE
+        self.color_id = shape_index + 1
         self.blocks = self.create_blocks()
+
+    def set_orientation(self, orientation):
+        self.orientation = orientation
+        self.shape = SHAPE_VECTORS[self.shape_index][orientation]
+        # 碰撞檢查用的 (N, 3) 整數偏移
+        self.offsets = ORIENTATIONS[self.shape_index][orientation]
     
     def create_blocks(self):
         blocks = []
@@ -55,27 +65,74 @@ class Tetromino:
     def move(self, dx, dy, dz):
         self.position = self.position + Vector3D(dx, dy, dz)
         self.blocks = self.create_blocks()
-        
-    def rotate_x(self):
-        new_shape = []
-        for offset in self.shape:
-            rotated = offset.rotate_x(math.pi / 2)
-            new_shape.append(Vector3D(round(rotated.x), round(rotated.y), round(rotated.z)))
-        self.shape = new_shape
+
+    def get_rotated_orientation(self, axis, direction=1):
+        """繞 axis 轉 90 度（direction 為 -1 時反轉）後的方向編號，不改變方塊本身"""
+        return ROTATIONS[self.shape_index][axis, direction][self.orientation]
+
+    def get_offsets(self, orientation):
+        return ORIENTATIONS[self.shape_index][orientation]
+
+    def rotate(self, axis, direction=1):
+        self.set_orientation(self.get_rotated_orientation(axis, direction))
         self.blocks = self.create_blocks()
-    
+
+    def rotate_x(self):
+        self.rotate('x')
+
     def rotate_y(self):
-        new_shape = []
-        for offset in self.shape:
-            rotated = offset.rotate_y(math.pi / 2)
-            new_shape.append(Vector3D(round(rotated.x), round(rotated.y), round(rotated.z)))
-        self.shape = new_shape
-        self.blocks = self.create_blocks()
-        
+        self.rotate('y')
+
     def rotate_z(self):
-        new_shape = []
-        for offset in self.shape:
-            rotated = offset.rotate_z(math.pi / 2)
-            new_shape.append(Vector3D(round(rotated.x), round(rotated.y), round(rotated.z)))
-        self.shape = new_shape
-        self.blocks = self.create_blocks()
+        self.rotate('z')
+
+# grid 裡的顏色編號對應的顏色：0 是空格，形狀 i 的方塊存成 i + 1
+PALETTE = [None] + [Tetromino.SHAPE_COLORS[i] for i in range(len(Tetromino.SHAPES))]
+
+# 繞各軸轉 90 度，和 Vector3D.rotate_x/y/z(math.pi / 2) 取整後相同
+QUARTER_TURNS = {
+    'x': lambda x, y, z: (x, -z, y),
+    'y': lambda x, y, z: (z, y, -x),
+    'z': lambda x, y, z: (-y, x, z),
+}
+
+def build_orientations(shape):
+    """展開 shape 所有不同的方向，回傳 (方向列表, 轉換表, 放置用方向)
+
+    方向是以原點那格為軸心旋轉後的格子，格子集合相同的只留一個。轉換表
+    rotations[axis, direction][i] 是方向 i 繞 axis 轉 90 度（direction 為 -1
+    時反轉）後的方向編號。只差平移的方向在搜尋落點時是重複的，所以另外
+    列出平移到最小角落後仍不同的方向編號。
+    """
+    orientations = [tuple((cell.x, cell.y, cell.z) for cell in shape)]
+    index = {frozenset(orientations[0]): 0}
+    turns = {axis: [] for axis in QUARTER_TURNS}
+    i = 0
+    while i < len(orientations):
+        for axis, turn in QUARTER_TURNS.items():
+            rotated = tuple(turn(*cell) for cell in orientations[i])
+            key = frozenset(rotated)
+            if key not in index:
+                index[key] = len(orientations)
+                orientations.append(rotated)
+            turns[axis].append(index[key])
+        i += 1
+    rotations = {}
+    for axis, forward in turns.items():
+        rotations[axis, 1] = np.array(forward)
+        backward = np.empty(len(forward), dtype=int)
+        backward[forward] = np.arange(len(forward))
+        rotations[axis, -1] = backward
+    offsets = [np.array(cells, dtype=int) for cells in orientations]
+    placements = []
+    seen = set()
+    for i, cells in enumerate(offsets):
+        key = frozenset(map(tuple, cells - cells.min(axis=0)))
+        if key not in seen:
+            seen.add(key)
+            placements.append(i)
+    return offsets, rotations, placements
+
+# 每種形狀的所有方向、旋轉轉換表和放置時不重複的方向，import 時算一次
+ORIENTATIONS, ROTATIONS, PLACEMENT_ORIENTATIONS = zip(*[build_orientations(shape) for shape in Tetromino.SHAPES])
+SHAPE_VECTORS = [[[Vector3D(*cell) for cell in cells.tolist()] for cells in offsets] for offsets in ORIENTATIONS]